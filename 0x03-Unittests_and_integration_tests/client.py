@@ -1,31 +1,54 @@
 #!/usr/bin/env python3
 """GithubOrgClient module for ALX 0x03 project."""
 
-from typing import List, Dict
-from utils import get_json, memoize
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Iterable, Optional
+from utils import CachedHTTPClient, get_json, memoize
 
 
 class GithubOrgClient:
-    """Client to access GitHub organization data."""
+    """
+    Client to access GitHub organization data.
 
-    def __init__(self, org_name: str):
+    Pass http (a utils.CachedHTTPClient) for the high-throughput mode:
+    keep-alive session, conditional GETs against a response cache and
+    every page of repos fetched concurrently.
+    """
+
+    ORG_URL = "https://api.github.com/orgs/{org}"
+
+    def __init__(self, org_name: str,
+                 http: Optional[CachedHTTPClient] = None) -> None:
         """Initialize with the organization name."""
         self.org_name = org_name
+        self.http = http
 
     def org(self) -> Dict:
-        """Return the organization payload as a dictionary."""
-        return get_json(f"https://api.github.com/orgs/{self.org_name}")
+        """Return the organization payload, fetched once per client."""
+        if not hasattr(self, "_org_payload"):
+            url = self.ORG_URL.format(org=self.org_name)
+            if self.http is None:
+                self._org_payload = get_json(url)
+            else:
+                self._org_payload = self.http.get_json(url)
+        return self._org_payload
 
     @property
     def _public_repos_url(self) -> str:
         """Return the repos_url from the organization payload."""
         return self.org()["repos_url"]
 
+    @memoize
+    def repos_payload(self) -> List[Dict]:
+        """Return the org's repositories (all pages in http mode)."""
+        if self.http is None:
+            return get_json(self._public_repos_url)
+        return self.http.get_json_pages(self._public_repos_url)
+
     @memoize
     def public_repos(self) -> List[str]:
         """Return a list of public repository names for the org."""
-        repos_data = get_json(self._public_repos_url)
-        return [repo["name"] for repo in repos_data]
+        return [repo["name"] for repo in self.repos_payload]
 
     @staticmethod
     def has_license(repo: Dict, license_key: str) -> bool:
@@ -33,4 +56,33 @@ class GithubOrgClient:
         license_info = repo.get("license")
         if license_info is None:
             return False
-        return license_info.get("key") == license_key
\ No newline at end of file
+        return license_info.get("key") == license_key
+
+    @classmethod
+    def bulk_public_repos(cls, org_names: Iterable[str],
+                          http: Optional[CachedHTTPClient] = None,
+                          license_key: Optional[str] = None,
+                          max_workers: int = 8) -> Dict[str, List[str]]:
+        """
+        Return {org name: repo names} for many orgs, fetched in parallel
+        over one shared http client; optionally only repos with
+        license_key.
+        """
+        owns_http = http is None
+        if owns_http:
+            http = CachedHTTPClient(max_workers=max_workers)
+
+        def repos(org_name: str) -> List[str]:
+            """Return the (filtered) repo names of one org."""
+            client = cls(org_name, http)
+            return [repo["name"] for repo in client.repos_payload
+                    if license_key is None
+                    or cls.has_license(repo, license_key)]
+
+        org_names = list(org_names)
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                return dict(zip(org_names, executor.map(repos, org_names)))
+        finally:
+            if owns_http:
+                http.close()
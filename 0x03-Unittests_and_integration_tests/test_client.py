@@ -1,10 +1,17 @@
 #!/usr/bin/env python3
 """Unit and integration tests for client.py ALX project."""
 
+import hashlib
+import json
+import tempfile
+import threading
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from parameterized import parameterized, parameterized_class
 from unittest.mock import patch, PropertyMock
+from urllib.parse import parse_qs, urlparse
 from client import GithubOrgClient
+from utils import CachedHTTPClient
 from fixtures import (
     org_payload,
     repos_payload,
@@ -29,6 +36,15 @@ class TestGithubOrgClient(unittest.TestCase):
             f"https://api.github.com/orgs/{org_name}"
         )
 
+    @patch("client.get_json")
+    def test_org_is_memoized(self, mock_get_json):
+        """Test that org is fetched once however often repos_url is read."""
+        mock_get_json.return_value = {"repos_url": "http://x/repos"}
+        client = GithubOrgClient("google")
+        self.assertEqual(client._public_repos_url, "http://x/repos")
+        self.assertEqual(client._public_repos_url, "http://x/repos")
+        mock_get_json.assert_called_once()
+
     def test_public_repos_url(self):
         """Test that _public_repos_url returns correct URL from org payload."""
         client = GithubOrgClient("test_org")
@@ -105,4 +121,118 @@ class TestIntegrationGithubOrgClient(unittest.TestCase):
             repo["name"] for repo in self.repos_payload
             if GithubOrgClient.has_license(repo, "apache-2.0")
         ]
-        self.assertEqual(result, self.apache2_repos)
\ No newline at end of file
+        self.assertEqual(result, self.apache2_repos)
+
+
+STUB_REPOS = {
+    "big": [{"name": f"repo{i}",
+             "license": {"key": "mit" if i % 2 else "apache-2.0"}}
+            for i in range(250)],
+    "small": [{"name": "only", "license": None}],
+}
+
+
+class StubGithubHandler(BaseHTTPRequestHandler):
+    """Serve /orgs/<org> and paginated /orgs/<org>/repos with ETags."""
+
+    counts = {"requests": 0, "not_modified": 0}
+    lock = threading.Lock()
+
+    def do_GET(self) -> None:
+        """Answer like the GitHub API: JSON body, ETag, Link header."""
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+        base = "http://{}:{}".format(*self.server.server_address)
+        headers = {}
+        if len(parts) == 2:
+            body = {"login": parts[1],
+                    "repos_url": f"{base}/orgs/{parts[1]}/repos"}
+        else:
+            query = parse_qs(url.query)
+            per_page = int(query.get("per_page", ["30"])[0])
+            page = int(query.get("page", ["1"])[0])
+            repos = STUB_REPOS[parts[1]]
+            body = repos[(page - 1) * per_page:page * per_page]
+            last = max(1, -(-len(repos) // per_page))
+            link = f"{base}{url.path}?per_page={per_page}&page="
+            links = []
+            if page < last:
+                links.append(f'<{link}{page + 1}>; rel="next"')
+            links.append(f'<{link}{last}>; rel="last"')
+            headers["Link"] = ", ".join(links)
+        data = json.dumps(body).encode("utf-8")
+        etag = '"{}"'.format(hashlib.sha1(data).hexdigest())
+        with self.lock:
+            self.counts["requests"] += 1
+            not_modified = self.headers.get("If-None-Match") == etag
+            if not_modified:
+                self.counts["not_modified"] += 1
+        self.send_response(304 if not_modified else 200)
+        self.send_header("ETag", etag)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if not_modified:
+            self.end_headers()
+            return
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args) -> None:
+        """Keep test output quiet."""
+
+
+class TestCachedGithubOrgClient(unittest.TestCase):
+    """Integration tests of the http mode against a local stub server."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Start the stub server and point ORG_URL at it."""
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubGithubHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        base = "http://{}:{}".format(*cls.server.server_address)
+        cls.url_patcher = patch.object(
+            GithubOrgClient, "ORG_URL", base + "/orgs/{org}")
+        cls.url_patcher.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Stop the stub server."""
+        cls.url_patcher.stop()
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        """Reset the request counters and use a fresh disk cache."""
+        StubGithubHandler.counts.update(requests=0, not_modified=0)
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+
+    def test_public_repos_fetches_every_page(self):
+        """Test that all 3 pages are fetched, in order."""
+        http = CachedHTTPClient(cache_dir=self.cache_dir.name)
+        self.addCleanup(http.close)
+        repos = GithubOrgClient("big", http).public_repos
+        self.assertEqual(repos, [f"repo{i}" for i in range(250)])
+        self.assertEqual(StubGithubHandler.counts["requests"], 4)
+
+    def test_conditional_requests_use_disk_cache(self):
+        """Test that a new client revalidates with ETags and gets 304s."""
+        first = CachedHTTPClient(cache_dir=self.cache_dir.name)
+        expected = GithubOrgClient("big", first).public_repos
+        first.close()
+
+        second = CachedHTTPClient(cache_dir=self.cache_dir.name)
+        self.addCleanup(second.close)
+        self.assertEqual(GithubOrgClient("big", second).public_repos,
+                         expected)
+        self.assertEqual(second.stats["not_modified"], 4)
+        self.assertEqual(second.stats["fetched"], 0)
+
+    def test_bulk_public_repos(self):
+        """Test that many orgs are fetched and filtered by license."""
+        result = GithubOrgClient.bulk_public_repos(
+            ["big", "small"], license_key="apache-2.0")
+        self.assertEqual(result["big"], [f"repo{i}" for i in range(0, 250, 2)])
+        self.assertEqual(result["small"], [])
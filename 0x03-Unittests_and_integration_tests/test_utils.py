@@ -4,7 +4,13 @@
 import unittest
 from parameterized import parameterized
 from unittest.mock import patch, Mock
-from utils import access_nested_map, get_json, memoize
+from utils import (
+    access_nested_map,
+    get_json,
+    memoize,
+    set_query_param,
+    CachedHTTPClient
+)
 
 
 class TestAccessNestedMap(unittest.TestCase):
@@ -77,5 +83,40 @@ class TestMemoize(unittest.TestCase):
             mock_method.assert_called_once()
 
 
+class TestSetQueryParam(unittest.TestCase):
+    """Tests for the set_query_param function."""
+
+    @parameterized.expand([
+        ("http://x/repos", "page", 2, "http://x/repos?page=2"),
+        ("http://x/repos?per_page=5&page=1", "page", 3,
+         "http://x/repos?per_page=5&page=3"),
+    ])
+    def test_set_query_param(self, url, name, value, expected):
+        """Test that the parameter is added or replaced."""
+        self.assertEqual(set_query_param(url, name, value), expected)
+
+
+class TestCachedHTTPClient(unittest.TestCase):
+    """Tests for CachedHTTPClient conditional requests."""
+
+    def test_revalidates_with_etag(self):
+        """Test that a cached ETag is sent and a 304 reuses the body."""
+        ok = Mock(status_code=200, headers={"ETag": '"v1"'}, links={})
+        ok.json.return_value = {"payload": True}
+        not_modified = Mock(status_code=304, headers={}, links={})
+        session = Mock()
+        session.get.side_effect = [ok, not_modified]
+
+        client = CachedHTTPClient(session=session)
+        self.addCleanup(client.close)
+        self.assertEqual(client.get_json("http://x"), {"payload": True})
+        self.assertEqual(client.get_json("http://x"), {"payload": True})
+
+        headers = session.get.call_args_list[1][1]["headers"]
+        self.assertEqual(headers, {"If-None-Match": '"v1"'})
+        not_modified.json.assert_not_called()
+        self.assertEqual(client.stats["not_modified"], 1)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,117 @@
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from chats.models import User, Conversation, Message
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database with a growing number of messages and "
+        "time the nested messages route (first page and a deeper page) at "
+        "each size. Latency should stay flat as the table grows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10000,100000,1000000',
+                            help='comma-separated total message counts')
+        parser.add_argument('--conversations', type=int, default=1000)
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--requests', type=int, default=200,
+                            help='timed requests per size and page')
+        parser.add_argument('--without-indexes', action='store_true',
+                            help='drop the message indexes to compare')
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options['sizes'].split(','))
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            if options['without_indexes']:
+                with connection.schema_editor() as editor:
+                    for index in Message._meta.indexes:
+                        editor.remove_index(Message, index)
+            conversation_ids = self.seed_conversations(
+                options['users'], options['conversations'])
+            self.stdout.write(f"{'messages':>10} {'first page':>12} {'page 5':>10}")
+            seeded = 0
+            for size in sizes:
+                self.seed_messages(conversation_ids, seeded, size)
+                seeded = size
+                first, deep = self.time_pages(conversation_ids, options['requests'])
+                deep = f'{deep:>7.2f} ms' if deep is not None else f"{'n/a':>10}"
+                self.stdout.write(f"{size:>10} {first:>9.2f} ms {deep}")
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def seed_conversations(self, users, conversations):
+        people = User.objects.bulk_create(
+            User(username=f'bench{n}', email=f'bench{n}@example.com')
+            for n in range(users)
+        )
+        created = Conversation.objects.bulk_create(
+            Conversation() for _ in range(conversations))
+        Through = Conversation.participants.through
+        Through.objects.bulk_create(
+            Through(conversation=conversation, user=person)
+            for conversation in created
+            for person in random.sample(people, 2)
+        )
+        self.senders = {
+            conversation.pk: [row.user_id for row in Through.objects.filter(
+                conversation=conversation)]
+            for conversation in created
+        }
+        return [conversation.pk for conversation in created]
+
+    def seed_messages(self, conversation_ids, start, stop, batch=50000):
+        """Insert messages start..stop spread over the conversations, raw for speed."""
+        base = datetime(2024, 1, 1)
+        sql = (
+            f'INSERT INTO {Message._meta.db_table} '
+            '(message_id, sender_id, conversation_id, message_body, sent_at) '
+            'VALUES (%s, %s, %s, %s, %s)'
+        )
+        with connection.cursor() as cursor:
+            for offset in range(start, stop, batch):
+                rows = []
+                for n in range(offset, min(offset + batch, stop)):
+                    conversation = conversation_ids[n % len(conversation_ids)]
+                    rows.append((
+                        uuid.uuid4().hex,
+                        random.choice(self.senders[conversation]).hex,
+                        conversation.hex,
+                        f'message {n}',
+                        (base + timedelta(seconds=n)).isoformat(' '),
+                    ))
+                cursor.executemany(sql, rows)
+
+    def time_pages(self, conversation_ids, requests):
+        """Median milliseconds for the first page and for page 5 (None if too few messages)."""
+        client = APIClient()
+        first, deep = [], []
+        for _ in range(requests):
+            url = reverse('conversation-messages-list',
+                          args=[random.choice(conversation_ids)])
+            started = time.perf_counter()
+            page = client.get(url).data
+            first.append(time.perf_counter() - started)
+            for _ in range(3):
+                page = client.get(page['next']).data if page['next'] else page
+            if page['next']:
+                started = time.perf_counter()
+                client.get(page['next'])
+                deep.append(time.perf_counter() - started)
+        return (
+            statistics.median(first) * 1000,
+            statistics.median(deep) * 1000 if deep else None,
+        )
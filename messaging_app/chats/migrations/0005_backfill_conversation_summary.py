@@ -0,0 +1,31 @@
+from django.db import migrations
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Substr
+
+
+def backfill_summary(apps, schema_editor):
+    Conversation = apps.get_model('chats', 'Conversation')
+    Message = apps.get_model('chats', 'Message')
+    messages = Message.objects.filter(conversation=OuterRef('pk'))
+    latest = messages.order_by('-sent_at')
+    counts = messages.order_by().values('conversation').annotate(n=Count('*')).values('n')
+    # one UPDATE with correlated subqueries, served by the
+    # (conversation, sent_at) index
+    Conversation.objects.update(
+        message_count=Coalesce(Subquery(counts), 0),
+        last_message_at=Coalesce(Subquery(latest.values('sent_at')[:1]), F('created_at')),
+        last_message_preview=Coalesce(
+            Substr(Subquery(latest.values('message_body')[:1]), 1, 100), Value(''),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chats', '0004_conversation_summary'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def start_read_pointers(apps, schema_editor):
+    # Existing history counts as read: unread counters start at 0 and the
+    # read pointer at the conversation's last message.
+    ConversationParticipant = apps.get_model('chats', 'ConversationParticipant')
+    Conversation = apps.get_model('chats', 'Conversation')
+    ConversationParticipant.objects.update(last_read_at=Subquery(
+        Conversation.objects.filter(pk=OuterRef('conversation_id')).values('last_message_at')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chats', '0005_backfill_conversation_summary'),
+    ]
+
+    operations = [
+        # The implicit many-to-many table chats_conversation_participants
+        # becomes the ConversationParticipant through model as is: only
+        # Django's state changes, the table and its rows stay in place.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='ConversationParticipant',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('conversation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='chats.conversation')),
+                        ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'db_table': 'chats_conversation_participants',
+                        'unique_together': {('conversation', 'user')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='conversation',
+                    name='participants',
+                    field=models.ManyToManyField(related_name='conversations', through='chats.ConversationParticipant', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='conversationparticipant',
+            name='last_read_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='conversationparticipant',
+            name='unread_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(start_read_pointers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 17:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chats', '0006_conversation_participant'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='conversation',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
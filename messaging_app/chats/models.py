@@ -1,6 +1,9 @@
 import uuid
 from django.db import models
+from django.db.models import Case, F, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest, Substr
 from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
 
 
 # --------------------------------------
@@ -30,14 +33,114 @@ class User(AbstractUser):
 # --------------------------------------
 # Conversation Model
 # --------------------------------------
+PREVIEW_LENGTH = 100
+
+
 class Conversation(models.Model):
     conversation_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    participants = models.ManyToManyField(User, related_name="conversations")
-    created_at = models.DateTimeField(auto_now_add=True)
+    participants = models.ManyToManyField(
+        User, related_name="conversations", through="ConversationParticipant"
+    )
+    # indexed for ConversationCursorPagination's -created_at ordering
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    # Denormalized summary of the messages, kept up to date by
+    # record_message(), refresh_last_message() and forget_message() so an
+    # inbox never has to read Message.
+    last_message_at = models.DateTimeField(default=timezone.now, db_index=True)
+    last_message_preview = models.CharField(max_length=PREVIEW_LENGTH, blank=True, default='')
+    message_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return f'Conversation {self.conversation_id}'
 
+    def record_message(self, message):
+        """
+        Fold a newly created message into the summary fields with a single
+        UPDATE; call it in the transaction that created the message.
+        Concurrent messages each add 1, and the preview only moves forward.
+        """
+        Conversation.objects.filter(pk=self.pk).update(
+            message_count=F('message_count') + 1,
+            last_message_preview=Case(
+                When(last_message_at__lte=message.sent_at,
+                     then=Value(message.message_body[:PREVIEW_LENGTH])),
+                default=F('last_message_preview'),
+            ),
+            last_message_at=Greatest('last_message_at', Value(message.sent_at)),
+        )
+        # unread counters: +1 for everyone else, the sender has read it all
+        memberships = ConversationParticipant.objects.filter(conversation_id=self.pk)
+        memberships.exclude(user_id=message.sender_id).update(
+            unread_count=F('unread_count') + 1
+        )
+        memberships.filter(user_id=message.sender_id).update(
+            unread_count=0, last_read_at=message.sent_at
+        )
+
+    def refresh_last_message(self):
+        """
+        Re-read last_message_at and the preview from the newest message with
+        a single UPDATE; call it in the transaction that edited a message.
+        """
+        Conversation.objects.filter(pk=self.pk).update(**self._last_message_fields())
+
+    def forget_message(self, message):
+        """
+        Take a deleted message out of the summary with a single UPDATE;
+        call it in the transaction that deleted the message.
+        """
+        Conversation.objects.filter(pk=self.pk).update(
+            message_count=F('message_count') - 1, **self._last_message_fields()
+        )
+        # unread counters: -1 for everyone who had not read it yet
+        ConversationParticipant.objects.filter(
+            Q(last_read_at__isnull=True) | Q(last_read_at__lt=message.sent_at),
+            conversation_id=self.pk, unread_count__gt=0,
+        ).exclude(user_id=message.sender_id).update(unread_count=F('unread_count') - 1)
+
+    def _last_message_fields(self):
+        # newest remaining message, one (conversation, sent_at) index probe;
+        # an empty conversation falls back to its creation time
+        newest = Message.objects.filter(conversation_id=self.pk).order_by('-sent_at')[:1]
+        return {
+            'last_message_at': Coalesce(
+                Subquery(newest.values('sent_at')), F('created_at')),
+            'last_message_preview': Coalesce(
+                Substr(Subquery(newest.values('message_body')), 1, PREVIEW_LENGTH),
+                Value(''), output_field=models.CharField()),
+        }
+
+
+# --------------------------------------
+# Conversation Participant (read state)
+# --------------------------------------
+class ConversationParticipant(models.Model):
+    """
+    Membership of a user in a conversation, with their read pointer.
+    unread_count is maintained incrementally by Conversation.record_message()
+    and forget_message(), and reset by mark_read(), so unread totals never
+    scan Message.
+    """
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name="memberships")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="memberships")
+    last_read_at = models.DateTimeField(null=True, blank=True)
+    unread_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        # the table Django created for the former implicit many-to-many
+        db_table = "chats_conversation_participants"
+        unique_together = [("conversation", "user")]
+
+    def __str__(self):
+        return f'{self.user_id} in {self.conversation_id}'
+
+    def mark_read(self, at=None):
+        """Move the read pointer to `at` (default: now) and clear the counter."""
+        self.last_read_at = at or timezone.now()
+        self.unread_count = 0
+        self.save(update_fields=["last_read_at", "unread_count"])
+
 
 # --------------------------------------
 # Message Model
@@ -49,5 +152,13 @@ class Message(models.Model):
     message_body = models.TextField()
     sent_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # A conversation's (or sender's) messages in sent_at order are one
+        # index range scan, whatever the size of the whole table.
+        indexes = [
+            models.Index(fields=['conversation', 'sent_at'], name='message_conversation_sent'),
+            models.Index(fields=['sender', 'sent_at'], name='message_sender_sent'),
+        ]
+
     def __str__(self):
         return f'Message from {self.sender.email}'
\ No newline at end of file
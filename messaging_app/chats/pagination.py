@@ -0,0 +1,25 @@
+from rest_framework.pagination import CursorPagination
+
+
+# Cursor pagination seeks from the last row seen instead of counting an
+# OFFSET, so every page costs the same at any depth and rows inserted while
+# a client pages through the list never shift it into duplicates or gaps.
+class ConversationCursorPagination(CursorPagination):
+    ordering = '-created_at'  # uses the created_at index
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class MessageCursorPagination(CursorPagination):
+    ordering = '-sent_at'  # newest first; older history via the next cursor
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class InboxCursorPagination(CursorPagination):
+    ordering = '-last_message_at'  # uses the last_message_at index
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import User, Conversation, Message
+from rest_framework.reverse import reverse
+from .models import User, Conversation, ConversationParticipant, Message
 
 # User serializer
 class UserSerializer(serializers.ModelSerializer):
@@ -18,10 +19,38 @@ class MessageSerializer(serializers.ModelSerializer):
 
 
 # Conversation serializer
+# Messages are not embedded: they are fetched page by page from messages_url.
 class ConversationSerializer(serializers.ModelSerializer):
     participants = UserSerializer(many=True, read_only=True)  # nested users
-    messages = MessageSerializer(many=True, read_only=True)   # nested messages in conversation
+    messages_url = serializers.SerializerMethodField()
 
     class Meta:
         model = Conversation
-        fields = ['conversation_id', 'participants', 'messages', 'created_at']
+        fields = [
+            'conversation_id', 'participants', 'messages_url', 'created_at',
+            'last_message_at', 'last_message_preview', 'message_count',
+        ]
+        read_only_fields = ['last_message_at', 'last_message_preview', 'message_count']
+
+    def get_messages_url(self, obj):
+        return reverse(
+            'conversation-messages-list',
+            kwargs={'conversation_pk': obj.pk},
+            request=self.context.get('request'),
+        )
+
+
+# Inbox entry: only the denormalized summary, no participants or messages.
+class InboxSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Conversation
+        fields = ['conversation_id', 'last_message_at', 'last_message_preview', 'message_count']
+
+
+# A user's read state in one conversation.
+class UnreadCountSerializer(serializers.ModelSerializer):
+    conversation_id = serializers.UUIDField(read_only=True)
+
+    class Meta:
+        model = ConversationParticipant
+        fields = ['conversation_id', 'unread_count', 'last_read_at']
@@ -1,3 +1,292 @@
-from django.test import TestCase
+import uuid
 
-# Create your tests here.
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from .models import User, Conversation, Message
+
+
+def make_conversation(participants, messages):
+    """Create a conversation with `participants` users and `messages` messages."""
+    users = [
+        User.objects.create(username=f'user{n}', email=f'user{n}@example.com')
+        for n in range(User.objects.count(), User.objects.count() + participants)
+    ]
+    conversation = Conversation.objects.create()
+    conversation.participants.set(users)
+    Message.objects.bulk_create(
+        Message(sender=users[i % len(users)], conversation=conversation,
+                message_body=f'message {i}')
+        for i in range(messages)
+    )
+    return conversation
+
+
+class QueryCountTests(APITestCase):
+    """Each endpoint must issue the same number of queries at any data size."""
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def assertConstantQueries(self, expected, url_for, sizes=((1, 1), (5, 40))):
+        """Run url_for(conversation) against small and large data sets."""
+        counts = []
+        for participants, messages in sizes:
+            conversation = make_conversation(participants, messages)
+            counts.append(self.count_queries(url_for(conversation)))
+        self.assertEqual(counts, [expected] * len(sizes))
+
+    def test_conversation_list(self):
+        self.assertConstantQueries(
+            2, lambda conversation: reverse('conversation-list'))
+
+    def test_conversation_list_many_conversations(self):
+        for _ in range(10):
+            make_conversation(3, 5)
+        with self.assertNumQueries(2):
+            self.client.get(reverse('conversation-list'))
+
+    def test_conversation_detail(self):
+        self.assertConstantQueries(2, lambda conversation: reverse(
+            'conversation-detail', args=[conversation.pk]))
+
+    def test_conversation_messages(self):
+        # the conversation lookup (404 if unknown) and the page of messages
+        self.assertConstantQueries(2, lambda conversation: reverse(
+            'conversation-messages-list', args=[conversation.pk]))
+
+
+class CursorPaginationTests(APITestCase):
+
+    def setUp(self):
+        self.conversation = make_conversation(2, 12)
+        self.url = reverse('conversation-messages-list', args=[self.conversation.pk])
+
+    def test_conversation_payload_links_messages(self):
+        response = self.client.get(
+            reverse('conversation-detail', args=[self.conversation.pk]))
+        self.assertNotIn('messages', response.data)
+        self.assertTrue(response.data['messages_url'].endswith(self.url))
+
+    def test_pages_are_stable_under_inserts(self):
+        first = self.client.get(self.url, {'page_size': 5}).data
+        self.assertEqual(len(first['results']), 5)
+        self.assertIsNone(first['previous'])
+
+        # a message arriving mid-pagination must not shift later pages
+        Message.objects.create(
+            sender=self.conversation.participants.first(),
+            conversation=self.conversation,
+            message_body='late arrival',
+        )
+        seen = [m['message_id'] for m in first['results']]
+        url = first['next']
+        while url:
+            page = self.client.get(url).data
+            seen.extend(m['message_id'] for m in page['results'])
+            url = page['next']
+
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(len(seen), 12)
+
+    def test_conversation_list_is_paginated(self):
+        for _ in range(3):
+            make_conversation(1, 0)
+        response = self.client.get(reverse('conversation-list'), {'page_size': 2})
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+
+class NestedMessageRouteTests(APITestCase):
+
+    def test_lists_only_the_conversations_messages(self):
+        conversation = make_conversation(2, 3)
+        make_conversation(2, 4)
+        response = self.client.get(
+            reverse('conversation-messages-list', args=[conversation.pk]))
+        self.assertEqual(
+            {m['message_id'] for m in response.data['results']},
+            {str(pk) for pk in conversation.messages.values_list('pk', flat=True)},
+        )
+
+    def test_create_sets_conversation_and_sender(self):
+        conversation = make_conversation(1, 0)
+        sender = conversation.participants.get()
+        self.client.force_authenticate(sender)
+        response = self.client.post(
+            reverse('conversation-messages-list', args=[conversation.pk]),
+            {'message_body': 'hello'},
+        )
+        self.assertEqual(response.status_code, 201)
+        message = conversation.messages.get()
+        self.assertEqual(message.sender, sender)
+
+    def test_create_requires_authentication(self):
+        conversation = make_conversation(1, 0)
+        for url in (reverse('conversation-messages-list', args=[conversation.pk]),
+                    reverse('conversation-add-message', args=[conversation.pk])):
+            with self.subTest(url=url):
+                response = self.client.post(url, {'message_body': 'hello'})
+                self.assertIn(response.status_code, (401, 403))
+        self.assertFalse(conversation.messages.exists())
+
+    def test_unknown_or_malformed_conversation_is_404(self):
+        message = make_conversation(1, 1).messages.get()
+        self.client.force_authenticate(message.sender)
+        for conversation_pk in (uuid.uuid4(), 'not-a-uuid'):
+            with self.subTest(conversation_pk=conversation_pk):
+                list_url = reverse('conversation-messages-list', args=[conversation_pk])
+                detail_url = reverse(
+                    'conversation-messages-detail', args=[conversation_pk, message.pk])
+                self.assertEqual(self.client.get(list_url).status_code, 404)
+                self.assertEqual(self.client.get(detail_url).status_code, 404)
+                response = self.client.post(list_url, {'message_body': 'hello'})
+                self.assertEqual(response.status_code, 404)
+
+
+class ConversationSummaryTests(APITestCase):
+
+    def setUp(self):
+        self.conversation = make_conversation(2, 0)
+        self.user = self.conversation.participants.first()
+        self.client.force_authenticate(self.user)
+
+    def post_message(self, body, nested=False):
+        if nested:
+            url = reverse('conversation-messages-list', args=[self.conversation.pk])
+        else:
+            url = reverse('conversation-add-message', args=[self.conversation.pk])
+        response = self.client.post(url, {'message_body': body})
+        self.assertEqual(response.status_code, 201)
+
+    def test_new_messages_update_the_summary(self):
+        self.post_message('first')
+        self.post_message('x' * 300, nested=True)
+        self.conversation.refresh_from_db()
+        latest = self.conversation.messages.latest('sent_at')
+        self.assertEqual(self.conversation.message_count, 2)
+        self.assertEqual(self.conversation.last_message_at, latest.sent_at)
+        self.assertEqual(self.conversation.last_message_preview, 'x' * 100)
+
+    def message_url(self, message):
+        return reverse('conversation-messages-detail', args=[self.conversation.pk, message.pk])
+
+    def test_editing_the_last_message_updates_the_preview(self):
+        self.post_message('first')
+        self.post_message('second')
+        latest = self.conversation.messages.latest('sent_at')
+        response = self.client.patch(self.message_url(latest), {'message_body': 'edited'})
+        self.assertEqual(response.status_code, 200)
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.message_count, 2)
+        self.assertEqual(self.conversation.last_message_preview, 'edited')
+
+    def test_deleting_messages_updates_the_summary(self):
+        self.post_message('first')
+        self.post_message('second')
+        first, second = self.conversation.messages.order_by('sent_at')
+        self.assertEqual(self.client.delete(self.message_url(second)).status_code, 204)
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.message_count, 1)
+        self.assertEqual(self.conversation.last_message_at, first.sent_at)
+        self.assertEqual(self.conversation.last_message_preview, 'first')
+
+        self.assertEqual(self.client.delete(self.message_url(first)).status_code, 204)
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.message_count, 0)
+        self.assertEqual(self.conversation.last_message_at, self.conversation.created_at)
+        self.assertEqual(self.conversation.last_message_preview, '')
+
+    def test_inbox_is_sorted_by_last_message_in_one_query(self):
+        older = self.conversation
+        newer = Conversation.objects.create()
+        newer.participants.add(self.user)
+        make_conversation(1, 0)  # someone else's conversation
+        self.post_message('bump')  # older becomes the most recent
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('conversation-inbox'))
+        ids = [entry['conversation_id'] for entry in response.data['results']]
+        self.assertEqual(ids, [str(older.pk), str(newer.pk)])
+        self.assertEqual(response.data['results'][0]['last_message_preview'], 'bump')
+
+    def test_inbox_requires_authentication(self):
+        self.client.force_authenticate(None)
+        response = self.client.get(reverse('conversation-inbox'))
+        self.assertIn(response.status_code, (401, 403))
+
+
+class UnreadCountTests(APITestCase):
+
+    def setUp(self):
+        self.conversation = make_conversation(3, 0)
+        self.alice, self.bob, self.carol = self.conversation.participants.order_by('username')
+        self.other = Conversation.objects.create()
+        self.other.participants.add(self.alice, self.bob)
+
+    def post_message(self, sender, conversation, body='hi'):
+        self.client.force_authenticate(sender)
+        response = self.client.post(
+            reverse('conversation-add-message', args=[conversation.pk]),
+            {'message_body': body},
+        )
+        self.assertEqual(response.status_code, 201)
+
+    def unread_for(self, user):
+        self.client.force_authenticate(user)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('conversation-unread'))
+        return response.data
+
+    def test_counters_follow_new_messages(self):
+        self.post_message(self.alice, self.conversation)
+        self.post_message(self.alice, self.conversation)
+        self.post_message(self.bob, self.other)
+
+        bob = self.unread_for(self.bob)
+        self.assertEqual(bob['total_unread'], 2)
+        counts = {e['conversation_id']: e['unread_count'] for e in bob['conversations']}
+        self.assertEqual(counts, {str(self.conversation.pk): 2, str(self.other.pk): 0})
+        self.assertEqual(self.unread_for(self.alice)['total_unread'], 1)
+        self.assertEqual(self.unread_for(self.carol)['total_unread'], 2)
+
+    def test_mark_read_resets_the_counter(self):
+        self.post_message(self.alice, self.conversation)
+        self.client.force_authenticate(self.carol)
+        response = self.client.post(
+            reverse('conversation-read', args=[self.conversation.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['unread_count'], 0)
+        self.assertIsNotNone(response.data['last_read_at'])
+        self.assertEqual(self.unread_for(self.carol)['total_unread'], 0)
+
+    def test_deleting_a_message_decrements_the_counters_of_unread_readers(self):
+        self.post_message(self.alice, self.conversation, 'first')
+        self.client.force_authenticate(self.carol)
+        self.client.post(reverse('conversation-read', args=[self.conversation.pk]))
+        self.post_message(self.alice, self.conversation, 'second')
+        first, second = self.conversation.messages.order_by('sent_at')
+
+        def delete(message):
+            self.client.force_authenticate(self.alice)
+            response = self.client.delete(reverse(
+                'conversation-messages-detail', args=[self.conversation.pk, message.pk]))
+            self.assertEqual(response.status_code, 204)
+
+        delete(second)  # unread by bob and carol
+        self.assertEqual(self.unread_for(self.bob)['total_unread'], 1)
+        self.assertEqual(self.unread_for(self.carol)['total_unread'], 0)
+        delete(first)  # carol had already read it
+        self.assertEqual(self.unread_for(self.bob)['total_unread'], 0)
+        self.assertEqual(self.unread_for(self.carol)['total_unread'], 0)
+        self.assertEqual(self.unread_for(self.alice)['total_unread'], 0)
+
+    def test_mark_read_requires_membership(self):
+        self.client.force_authenticate(self.carol)
+        response = self.client.post(reverse('conversation-read', args=[self.other.pk]))
+        self.assertEqual(response.status_code, 404)
@@ -2,25 +2,109 @@ from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
-from .models import User, Conversation, Message
-from .serializers import UserSerializer, ConversationSerializer, MessageSerializer
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.generics import get_object_or_404
+from django.db import transaction
+from .models import User, Conversation, ConversationParticipant, Message
+from .pagination import (
+    ConversationCursorPagination, InboxCursorPagination, MessageCursorPagination,
+)
+from .serializers import (
+    UserSerializer, ConversationSerializer, InboxSerializer, MessageSerializer,
+    UnreadCountSerializer,
+)
 
 class ConversationViewSet(viewsets.ModelViewSet):
     queryset = Conversation.objects.all()
     serializer_class = ConversationSerializer
+    pagination_class = ConversationCursorPagination
 
-    @action(detail=True, methods=['post'])
+    def get_queryset(self):
+        # One query for the page of conversations and one for their
+        # participants, however many rows the page holds.
+        return Conversation.objects.prefetch_related('participants')
+
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def add_message(self, request, pk=None):
         conversation = self.get_object()
         serializer = MessageSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(conversation=conversation, sender=request.user)
+            with transaction.atomic():
+                message = serializer.save(conversation=conversation, sender=request.user)
+                conversation.record_message(message)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, permission_classes=[IsAuthenticated],
+            pagination_class=InboxCursorPagination)
+    def inbox(self, request):
+        """The user's conversations, most recently active first, in one query."""
+        queryset = Conversation.objects.filter(participants=request.user).only(
+            'conversation_id', 'last_message_at', 'last_message_preview', 'message_count',
+        )
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(InboxSerializer(page, many=True).data)
+
+    @action(detail=False, permission_classes=[IsAuthenticated], pagination_class=None)
+    def unread(self, request):
+        """Unread counts of all the user's conversations, read from their counters in one query."""
+        memberships = ConversationParticipant.objects.filter(user=request.user).only(
+            'conversation_id', 'last_read_at', 'unread_count',
+        ).order_by('-conversation__last_message_at')
+        data = UnreadCountSerializer(memberships, many=True).data
+        return Response({
+            'total_unread': sum(entry['unread_count'] for entry in data),
+            'conversations': data,
+        })
+
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
+    def read(self, request, pk=None):
+        """Mark the conversation read up to now for the requesting user."""
+        membership = get_object_or_404(
+            ConversationParticipant, conversation_id=pk, user=request.user)
+        membership.mark_read()
+        return Response(UnreadCountSerializer(membership).data)
+
 class MessageViewSet(viewsets.ModelViewSet):
     queryset = Message.objects.all()
     serializer_class = MessageSerializer
+    pagination_class = MessageCursorPagination
+
+    def get_conversation(self):
+        """The conversation in the URL; 404 when it is unknown or not a UUID."""
+        if not hasattr(self, '_conversation'):
+            self._conversation = get_object_or_404(
+                Conversation.objects.only('pk'), pk=self.kwargs['conversation_pk'])
+        return self._conversation
+
+    def get_permissions(self):
+        # a new message needs a sender
+        if self.action == 'create':
+            return [IsAuthenticated()]
+        return super().get_permissions()
+
+    def get_queryset(self):
+        # Only the messages of the conversation in the URL, served by the
+        # (conversation, sent_at) index.
+        return Message.objects.select_related('sender').filter(
+            conversation=self.get_conversation()
+        )
+
+    def perform_create(self, serializer):
+        conversation = self.get_conversation()
+        with transaction.atomic():
+            message = serializer.save(conversation=conversation, sender=self.request.user)
+            conversation.record_message(message)
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            serializer.save()
+            self.get_conversation().refresh_last_message()
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            self.get_conversation().forget_message(instance)
 
 class UserListCreateAPIView(viewsets.ModelViewSet):
     queryset = User.objects.all()
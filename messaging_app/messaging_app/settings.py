@@ -83,6 +83,12 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # chats.User (AUTH_USER_MODEL) is created by chats 0002, after the
+        # admin migrations that depend on it, so the test database is built
+        # from the models instead of by replaying migrations.
+        'TEST': {
+            'MIGRATE': False,
+        },
     }
 }
 
@@ -5,25 +5,50 @@ Custom class-based context manager for SQLite database connections.
 """
 
 import sqlite3
+import time
+
+from connection_registry import default_registry
 
 
 class DatabaseConnection:
-    """A class-based context manager for database connections."""
+    """
+    A class-based context manager for database connections.
+
+    With shared=True the connection is leased from a process-wide
+    ConnectionRegistry (one connection per thread and database, kept open
+    between blocks) instead of being opened and closed every time.
+    acquire_time and release_time hold the last block's timings in seconds.
+    """
 
-    def __init__(self, db_name):
+    def __init__(self, db_name, shared=False, registry=None):
         """Initialize with database filename."""
         self.db_name = db_name
+        self.shared = shared
+        self.registry = registry or default_registry
         self.connection = None
+        self.acquire_time = None
+        self.release_time = None
 
     def __enter__(self):
-        """Open the database connection."""
-        self.connection = sqlite3.connect(self.db_name)
+        """Open (or lease) the database connection."""
+        started = time.perf_counter()
+        if self.shared:
+            self.connection = self.registry.lease(self.db_name)
+        else:
+            self.connection = sqlite3.connect(self.db_name)
+        self.acquire_time = time.perf_counter() - started
         return self.connection
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        """Close the connection when exiting the context."""
+        """Close (or give back) the connection when exiting the context."""
         if self.connection:
-            self.connection.close()
+            started = time.perf_counter()
+            if self.shared:
+                self.registry.give_back(self.connection)
+            else:
+                self.connection.close()
+            self.release_time = time.perf_counter() - started
+            self.connection = None
 
 
 # Example usage
@@ -4,6 +4,9 @@ Task 1: Reusable Query Context Manager
 """
 
 import sqlite3
+from itertools import chain
+
+from row_factories import connection_row_factory, row_converter
 
 
 class ExecuteQuery:
@@ -12,12 +15,23 @@ class ExecuteQuery:
     - Opens DB connection
     - Executes a query with parameters
     - Returns results
+
+    By default the results are a list (fetchall). With stream=True they
+    are an iterator that fetches chunk_size rows at a time while the with
+    body runs; add chunks=True to get each fetchmany chunk as a list.
+    row_factory picks the row type: "tuple" (default), "row" (sqlite3.Row),
+    "record" (slotted object) or "dict".
     """
 
-    def __init__(self, database, query, params=None):
+    def __init__(self, database, query, params=None, stream=False,
+                 chunk_size=256, chunks=False, row_factory="tuple"):
         self.database = database
         self.query = query
         self.params = params
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.chunks = chunks
+        self.row_factory = row_factory
         self.conn = None
         self.cursor = None
         self.result = None
@@ -25,16 +39,34 @@ class ExecuteQuery:
     def __enter__(self):
         """Open DB connection and execute query"""
         self.conn = sqlite3.connect(self.database)
+        self.conn.row_factory = connection_row_factory(self.row_factory)
         self.cursor = self.conn.cursor()
+        self.cursor.arraysize = self.chunk_size
 
         if self.params:
             self.cursor.execute(self.query, self.params)
         else:
             self.cursor.execute(self.query)
 
-        self.result = self.cursor.fetchall()
+        convert = row_converter(self.row_factory, self.cursor.description or ())
+        if self.stream:
+            self.result = self._iter_chunks(convert)
+            if not self.chunks:
+                self.result = chain.from_iterable(self.result)
+        else:
+            self.result = self.cursor.fetchall()
+            if convert is not None:
+                self.result = [convert(row) for row in self.result]
         return self.result
 
+    def _iter_chunks(self, convert):
+        """Yield lists of up to chunk_size rows until the result is exhausted."""
+        while True:
+            rows = self.cursor.fetchmany()
+            if not rows:
+                return
+            yield rows if convert is None else [convert(row) for row in rows]
+
     def __exit__(self, exc_type, exc_value, traceback):
         """Close cursor and DB connection"""
         if self.cursor:
@@ -1,38 +1,40 @@
 #!/usr/bin/env python3
 """
 Task 3: Concurrent Asynchronous Database Queries
+Queries go through a QueryScheduler, which bounds how many run at once on
+a shared aiosqlite connection pool (see query_scheduler.py, async_pool.py).
 """
 
 import asyncio
-import aiosqlite
 
+from async_pool import close_pools
+from query_scheduler import QueryScheduler
 
-async def async_fetch_users(db_name):
+
+async def async_fetch_users(db_name, scheduler=None):
     """Fetch all users asynchronously"""
-    async with aiosqlite.connect(db_name) as db:
-        cursor = await db.execute("SELECT * FROM users")
-        rows = await cursor.fetchall()
-        await cursor.close()
-        return rows
+    scheduler = scheduler or QueryScheduler(db_name)
+    return await scheduler.fetch("SELECT * FROM users")
 
 
-async def async_fetch_older_users(db_name):
+async def async_fetch_older_users(db_name, scheduler=None):
     """Fetch users older than 40 asynchronously"""
-    async with aiosqlite.connect(db_name) as db:
-        cursor = await db.execute("SELECT * FROM users WHERE age > 40")
-        rows = await cursor.fetchall()
-        await cursor.close()
-        return rows
+    scheduler = scheduler or QueryScheduler(db_name)
+    return await scheduler.fetch("SELECT * FROM users WHERE age > 40")
 
 
 async def fetch_concurrently():
     """Run both queries concurrently"""
     db_name = "my_database.db"
+    scheduler = QueryScheduler(db_name, concurrency=2, timeout=30)
 
-    all_users, older_users = await asyncio.gather(
-        async_fetch_users(db_name),
-        async_fetch_older_users(db_name)
-    )
+    try:
+        all_users, older_users = await asyncio.gather(
+            async_fetch_users(db_name, scheduler),
+            async_fetch_older_users(db_name, scheduler)
+        )
+    finally:
+        await close_pools()
 
     print("All Users:")
     for row in all_users:
@@ -44,4 +46,4 @@ async def fetch_concurrently():
 
 
 if __name__ == "__main__":
-    asyncio.run(fetch_concurrently())
\ No newline at end of file
+    asyncio.run(fetch_concurrently())
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+async_pool.py
+Asyncio connection pool for aiosqlite.
+
+Every aiosqlite connection owns a background thread, so opening one per
+coroutine turns N concurrent queries into N threads and N connections.
+An AsyncSQLitePool keeps at most `size` connections per database:
+- acquire() waits for a free connection, at most `timeout` seconds, then
+  raises PoolTimeout;
+- idle connections are checked with SELECT 1 before reuse when they have
+  been idle for more than `check_after` seconds, and replaced if broken;
+- the pragmas (see pragmas.py; wal=True adds journal_mode=WAL) are
+  applied once per connection;
+- a connection released inside an open transaction is rolled back.
+
+Usage:
+    async with get_pool("my_database.db").connection() as db:
+        cursor = await db.execute("SELECT * FROM users")
+"""
+
+import asyncio
+import time
+import weakref
+
+import aiosqlite
+
+from pragmas import pragma_statements, resolve_pragmas
+
+
+class PoolTimeout(asyncio.TimeoutError):
+    """No pooled connection became free within the acquire timeout."""
+
+
+class AsyncSQLitePool:
+    """Bounded pool of aiosqlite connections to one database file."""
+
+    def __init__(self, database, size=5, timeout=5.0, pragmas=None,
+                 check_after=30.0, wal=False):
+        """Configure the pool; connections are opened on demand."""
+        self.database = database
+        self.size = size
+        self.timeout = timeout
+        self.pragmas = resolve_pragmas(pragmas, wal)
+        self.check_after = check_after
+        self._slots = asyncio.Semaphore(size)
+        self._idle = []  # (connection, idle since)
+        self._open = 0
+        self._closed = False
+        self.created = 0
+        self.checkouts = 0
+        self.reuses = 0
+        self.discarded = 0
+        self.timeouts = 0
+
+    async def acquire(self):
+        """Check out a connection, opening one if none is idle."""
+        if self._closed:
+            raise RuntimeError(f"pool for {self.database} is closed")
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise PoolTimeout(
+                f"No free connection to {self.database} after {self.timeout}s"
+            ) from None
+        try:
+            while self._idle:
+                conn, idle_since = self._idle.pop()
+                if await self._healthy(conn, idle_since):
+                    self.checkouts += 1
+                    self.reuses += 1
+                    return conn
+                await self._discard(conn)
+            conn = await self._connect()
+            self.checkouts += 1
+            return conn
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def release(self, conn):
+        """Return a connection obtained from acquire()."""
+        try:
+            if self._closed:
+                await self._discard(conn)
+                return
+            try:
+                if conn.in_transaction:
+                    await conn.rollback()
+            except Exception:
+                await self._discard(conn)
+                return
+            self._idle.append((conn, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def connection(self):
+        """Async context manager: `async with pool.connection() as db: ...`."""
+        return _Lease(self)
+
+    async def close(self):
+        """Close idle connections; connections in use close when released."""
+        self._closed = True
+        idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            await self._discard(conn)
+
+    def stats(self):
+        """Return counters and the current number of open/idle connections."""
+        return {
+            "size": self.size,
+            "open": self._open,
+            "idle": len(self._idle),
+            "created": self.created,
+            "checkouts": self.checkouts,
+            "reuses": self.reuses,
+            "discarded": self.discarded,
+            "timeouts": self.timeouts,
+        }
+
+    async def _connect(self):
+        conn = await aiosqlite.connect(self.database)
+        try:
+            for statement in pragma_statements(self.pragmas):
+                await conn.execute(statement)
+        except BaseException:
+            await conn.close()
+            raise
+        self._open += 1
+        self.created += 1
+        return conn
+
+    async def _healthy(self, conn, idle_since):
+        if time.monotonic() - idle_since < self.check_after:
+            return True
+        try:
+            await conn.execute("SELECT 1")
+            return True
+        except Exception:
+            return False
+
+    async def _discard(self, conn):
+        self._open -= 1
+        self.discarded += 1
+        try:
+            await conn.close()
+        except Exception:
+            pass
+
+
+class _Lease:
+    def __init__(self, pool):
+        self.pool = pool
+        self.conn = None
+
+    async def __aenter__(self):
+        self.conn = await self.pool.acquire()
+        return self.conn
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.pool.release(self.conn)
+        return False
+
+
+# event loop -> {database: pool}; asyncio primitives belong to one loop
+_pools = weakref.WeakKeyDictionary()
+
+
+def get_pool(database, **options):
+    """Return the running loop's shared pool for a database file."""
+    pools = _pools.setdefault(asyncio.get_running_loop(), {})
+    pool = pools.get(database)
+    if pool is None:
+        pool = pools[database] = AsyncSQLitePool(database, **options)
+    return pool
+
+
+async def close_pools():
+    """Close every pool of the running loop (call before the loop ends)."""
+    pools = _pools.pop(asyncio.get_running_loop(), {})
+    for pool in pools.values():
+        await pool.close()
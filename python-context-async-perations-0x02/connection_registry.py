@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+connection_registry.py
+Process-wide reuse of sqlite3 connections for short-lived `with` blocks.
+
+A ConnectionRegistry keeps one open connection per (thread, database
+path). sqlite3 connections stay on the thread that created them, so
+check_same_thread keeps its protection and no locking is needed on the
+hot path.
+- lease() hands back the calling thread's connection, opening it (and
+  applying the pragmas) on first use. A nested lease of the same
+  database on the same thread shares it.
+- give_back() rolls back any transaction left open, as closing the
+  connection used to, and keeps the connection for the next lease. A
+  connection given back on another thread is only marked as released:
+  its owner thread rolls it back (or closes it) at its next lease, since
+  sqlite3 objects may only be used on the thread that created them.
+- Connections idle for more than max_idle seconds are closed the next
+  time their thread leases a connection.
+- stats() reports lease counts and acquire/release timings.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from pragmas import pragma_statements, resolve_pragmas
+
+
+class _Slot:
+    __slots__ = ("conn", "depth", "last_used", "handed_back")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.depth = 0
+        self.last_used = time.monotonic()
+        self.handed_back = 0  # releases made on other threads
+
+
+class ConnectionRegistry:
+    """Per-thread cache of open sqlite3 connections, keyed by database path."""
+
+    def __init__(self, max_idle=60.0, pragmas=None, wal=False):
+        """max_idle: seconds an unused connection may stay open."""
+        self.max_idle = max_idle
+        self.pragmas = resolve_pragmas(pragmas, wal)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._owners = {}  # id(conn) -> _Slot, for give_back() on other threads
+        self._counters = dict.fromkeys(
+            ("leases", "connects", "reuses", "idle_closed", "releases"), 0)
+        self._timings = {
+            "acquire": [0.0, 0.0],  # total, max (seconds)
+            "release": [0.0, 0.0],
+        }
+
+    def lease(self, database):
+        """Return this thread's connection to database, opening it if needed."""
+        started = time.perf_counter()
+        slots = self._slots()
+        key = os.path.abspath(database) if database != ":memory:" else database
+        now = time.monotonic()
+        self._sweep(slots, now)
+
+        slot = slots.get(key)
+        if slot is None:
+            slot = slots[key] = _Slot(self._connect(database))
+            with self._lock:
+                self._owners[id(slot.conn)] = slot
+            self._count("connects")
+        elif slot.depth == 0:
+            self._count("reuses")
+        slot.depth += 1
+        slot.last_used = now
+        self._count("leases")
+        self._time("acquire", time.perf_counter() - started)
+        return slot.conn
+
+    def give_back(self, conn):
+        """Release a connection obtained from lease() on this thread."""
+        started = time.perf_counter()
+        for slot in self._slots().values():
+            if slot.conn is conn:
+                self._release(slot, 1)
+                break
+        else:
+            # leased on another thread: leave it to its owner thread
+            with self._lock:
+                slot = self._owners.get(id(conn))
+                if slot is not None and slot.conn is conn:
+                    slot.handed_back += 1
+        self._count("releases")
+        self._time("release", time.perf_counter() - started)
+
+    def close_thread_connections(self):
+        """Close every idle connection held by the calling thread."""
+        slots = self._slots()
+        self._sweep(slots, time.monotonic())
+        for key, slot in list(slots.items()):
+            if slot.depth == 0:
+                self._close(slots, key)
+
+    def stats(self):
+        """Return lease counters and acquire/release timings in seconds."""
+        with self._lock:
+            stats = dict(self._counters)
+            for name, (total, longest) in self._timings.items():
+                count = stats["leases"] if name == "acquire" else stats["releases"]
+                stats[f"{name}_total"] = total
+                stats[f"{name}_max"] = longest
+                stats[f"{name}_avg"] = total / count if count else 0.0
+            return stats
+
+    def _slots(self):
+        slots = getattr(self._local, "slots", None)
+        if slots is None:
+            slots = self._local.slots = {}
+        return slots
+
+    def _sweep(self, slots, now):
+        """Apply releases made on other threads, then close idle connections."""
+        for key, slot in list(slots.items()):
+            if slot.handed_back:
+                with self._lock:
+                    count, slot.handed_back = slot.handed_back, 0
+                self._release(slot, count)
+            if slot.depth == 0 and now - slot.last_used > self.max_idle:
+                self._close(slots, key)
+                self._count("idle_closed")
+
+    def _release(self, slot, count):
+        slot.depth -= count
+        if slot.depth == 0:
+            if slot.conn.in_transaction:
+                slot.conn.rollback()
+            slot.last_used = time.monotonic()
+
+    def _close(self, slots, key):
+        slot = slots.pop(key)
+        with self._lock:
+            self._owners.pop(id(slot.conn), None)
+        slot.conn.close()
+
+    def _connect(self, database):
+        conn = sqlite3.connect(database)
+        for statement in pragma_statements(self.pragmas):
+            conn.execute(statement)
+        return conn
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _time(self, name, seconds):
+        with self._lock:
+            timing = self._timings[name]
+            timing[0] += seconds
+            if seconds > timing[1]:
+                timing[1] = seconds
+
+
+# Shared by every DatabaseConnection(shared=True) in the process.
+default_registry = ConnectionRegistry()
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+pragmas.py
+PRAGMA settings applied to every new connection by connection_registry.py
+(sqlite3) and async_pool.py (aiosqlite).
+
+journal_mode=WAL lets readers run while a writer commits, but it is
+stored in the database file itself and leaves -wal/-shm files next to
+it, so it is opt-in (wal=True).
+"""
+
+DEFAULT_PRAGMAS = {
+    "busy_timeout": 5000,
+    "foreign_keys": "ON",
+}
+
+# synchronous=NORMAL is only crash-safe in WAL mode
+WAL_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+}
+
+
+def resolve_pragmas(pragmas=None, wal=False):
+    """Return pragmas (default: DEFAULT_PRAGMAS), plus WAL_PRAGMAS when wal."""
+    pragmas = DEFAULT_PRAGMAS if pragmas is None else pragmas
+    return {**pragmas, **WAL_PRAGMAS} if wal else pragmas
+
+
+def pragma_statements(pragmas):
+    """Return the PRAGMA statements setting each name to its value."""
+    return [f"PRAGMA {name} = {value}" for name, value in pragmas.items()]
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+query_scheduler.py
+Bounded-concurrency fan-out of aiosqlite queries.
+
+A QueryScheduler runs any number of queries over the shared async_pool
+connections while keeping at most `concurrency` of them in flight:
+- stream(sql, params) yields rows as an async iterator, fetching
+  `chunk_size` rows at a time instead of materializing the full result;
+- each query can have a timeout, which covers the whole query: execution
+  plus every fetch. On timeout or cancellation the running statement is
+  interrupted and the connection goes back to the pool;
+- run(queries, handler) fans out many queries and hands each handler an
+  async iterator of rows. With return_exceptions=False, the first
+  failure cancels the rest.
+
+Usage:
+    scheduler = QueryScheduler("my_database.db", concurrency=4)
+
+    async def count(index, rows):
+        return sum([1 async for _ in rows])
+
+    counts = await scheduler.run(queries, count)
+"""
+
+import asyncio
+import time
+
+from async_pool import get_pool
+
+
+class QueryScheduler:
+    """Run queries on a pooled database with bounded concurrency."""
+
+    def __init__(self, database, concurrency=5, timeout=None, chunk_size=256,
+                 pool=None):
+        """Configure limits; timeout is the default per-query budget in seconds."""
+        self.database = database
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self._pool = pool
+        self._slots = None
+        self._tasks = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.cancelled = 0
+
+    @property
+    def pool(self):
+        """The connection pool, created on first use in the running loop."""
+        if self._pool is None:
+            self._pool = get_pool(self.database, size=self.concurrency)
+        return self._pool
+
+    async def stream(self, sql, params=(), timeout=None):
+        """Yield the rows of one query, fetched chunk_size at a time."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.concurrency)
+        timeout = self.timeout if timeout is None else timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        async with self._slots:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                async with self.pool.connection() as db:
+                    cursor = None
+                    try:
+                        cursor = await self._within(deadline, db.execute(sql, params))
+                        while True:
+                            rows = await self._within(
+                                deadline, cursor.fetchmany(self.chunk_size))
+                            if not rows:
+                                break
+                            for row in rows:
+                                yield row
+                    except (asyncio.TimeoutError, asyncio.CancelledError,
+                            GeneratorExit) as e:
+                        if isinstance(e, asyncio.TimeoutError):
+                            self.timed_out += 1
+                        # stop the statement running in the connection's thread
+                        await db.interrupt()
+                        raise
+                    finally:
+                        if cursor is not None:
+                            await cursor.close()
+                self.completed += 1
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                raise
+            except Exception:
+                self.failed += 1
+                raise
+            finally:
+                self.in_flight -= 1
+
+    async def fetch(self, sql, params=(), timeout=None):
+        """Return all rows of one query as a list."""
+        return [row async for row in self.stream(sql, params, timeout)]
+
+    async def run(self, queries, handler, return_exceptions=False):
+        """
+        Run handler(index, rows) for every query, at most `concurrency` at a
+        time, and return the handler results in query order. A query is an
+        SQL string or a (sql, params) / (sql, params, timeout) tuple.
+        """
+        queries = iter(enumerate(queries))
+        results = {}
+
+        async def worker():
+            for index, query in queries:
+                if isinstance(query, str):
+                    query = (query,)
+                rows = self.stream(*query)
+                try:
+                    results[index] = await handler(index, rows)
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    results[index] = e
+                finally:
+                    await rows.aclose()
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        self._tasks.update(workers)
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self._tasks.difference_update(workers)
+        return [results[index] for index in sorted(results)]
+
+    def cancel(self):
+        """Cancel every query started by run() that is still in flight."""
+        for task in self._tasks:
+            task.cancel()
+
+    def stats(self):
+        """Return completion counters and the peak number of queries in flight."""
+        return {
+            "concurrency": self.concurrency,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "cancelled": self.cancelled,
+        }
+
+    @staticmethod
+    async def _within(deadline, awaitable):
+        if deadline is None:
+            return await awaitable
+        return await asyncio.wait_for(awaitable, deadline - time.monotonic())
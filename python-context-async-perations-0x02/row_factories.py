@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+row_factories.py
+Row representations for sqlite3 cursors, cheapest first:
+- "tuple":  plain tuples (no conversion at all);
+- "row":    sqlite3.Row, indexable by position and by column name;
+- "record": a generated class with __slots__ per column list, attribute access;
+- "dict":   one dict per row, column name -> value.
+"""
+
+import keyword
+import sqlite3
+
+
+def dict_factory(cursor, row):
+    """Row factory returning {column name: value}."""
+    return dict(zip([column[0] for column in cursor.description], row))
+
+
+_record_types = {}
+
+
+def field_names(columns):
+    """
+    Return columns as attribute names: names that are not identifiers, are
+    keywords, start with an underscore or repeat an earlier column (e.g. the
+    two `id` columns of a join) become _<index>, like namedtuple(rename=True).
+    """
+    names = []
+    seen = set()
+    for index, name in enumerate(columns):
+        if (not name.isidentifier() or keyword.iskeyword(name)
+                or name.startswith("_") or name in seen):
+            name = f"_{index}"
+        seen.add(name)
+        names.append(name)
+    return tuple(names)
+
+
+def record_type(columns):
+    """Create (once per column list) a class with __slots__ = field_names(columns)."""
+    cls = _record_types.get(columns)
+    if cls is None:
+        fields = field_names(columns)
+
+        def __init__(self, *values):
+            for name, value in zip(fields, values):
+                setattr(self, name, value)
+
+        cls = type("Record", (), {
+            "__slots__": fields,
+            "__init__": __init__,
+            "__repr__": lambda self: "Record(" + ", ".join(
+                f"{name}={getattr(self, name)!r}" for name in fields) + ")",
+        })
+        _record_types[columns] = cls
+    return cls
+
+
+def record_factory(cursor, row):
+    """Row factory returning a slotted Record for the cursor's columns."""
+    return record_type(tuple(column[0] for column in cursor.description))(*row)
+
+
+ROW_FACTORIES = ("tuple", "row", "record", "dict")
+
+
+def connection_row_factory(name):
+    """Return the conn.row_factory to use for name (sqlite3.Row or None)."""
+    if name not in ROW_FACTORIES:
+        raise ValueError(f"row_factory must be one of {', '.join(ROW_FACTORIES)}")
+    return sqlite3.Row if name == "row" else None
+
+
+def row_converter(name, description):
+    """
+    Return a function turning one tuple row of a result with this
+    cursor.description into the named representation, or None when rows
+    need no conversion ("tuple", and "row" which sqlite3 builds itself).
+    Column names are looked up once, not per row.
+    """
+    columns = tuple(column[0] for column in description)
+    if name == "record":
+        cls = record_type(columns)
+        return lambda row: cls(*row)
+    if name == "dict":
+        return lambda row: dict(zip(columns, row))
+    return None
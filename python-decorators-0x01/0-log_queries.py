@@ -2,14 +2,28 @@ import sqlite3
 import functools
 from datetime import datetime  # ✅ MUST be exactly like this
 
+from query_metrics import instrument_queries
+
 # Decorator to log SQL queries
-def log_queries(func):
+def log_queries(func=None, *, echo=True, **options):
+    """
+    Log the SQL query and record its latency, row count and errors in
+    query_metrics.registry. Pass echo=False to skip the print on hot paths;
+    other options (sample_rate, slow_threshold, ...) go to instrument_queries.
+    """
+    if func is None:
+        return lambda f: log_queries(f, echo=echo, **options)
+
+    instrumented = instrument_queries(func, **options)
+    if not echo:
+        return instrumented
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         # Assuming the query is passed as a keyword argument or first positional argument
         query = kwargs.get('query') or (args[0] if args else None)
         print(f"[LOG] Executing SQL query: {query}")
-        return func(*args, **kwargs)
+        return instrumented(*args, **kwargs)
     return wrapper
 
 @log_queries
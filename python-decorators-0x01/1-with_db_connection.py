@@ -1,11 +1,21 @@
 import sqlite3
 import functools
 
+from connection_pool import with_pooled_connection
+
 # Decorator to handle database connection automatically
-def with_db_connection(func):
+# Use @with_db_connection(pooled=True) to reuse pooled connections instead
+# of opening and closing one on every call.
+def with_db_connection(func=None, *, database='users.db', pooled=False, pool_size=None):
+    if func is None:
+        return lambda f: with_db_connection(
+            f, database=database, pooled=pooled, pool_size=pool_size)
+    if pooled:
+        return with_pooled_connection(database, pool_size)(func)
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        conn = sqlite3.connect('users.db')  # open DB connection
+        conn = sqlite3.connect(database)  # open DB connection
         try:
             return func(conn, *args, **kwargs)  # pass connection to the function
         finally:
@@ -1,6 +1,8 @@
 import sqlite3
 import functools
 
+from transactions import atomic
+
 # Task 1 decorator: handle DB connection
 def with_db_connection(func):
     @functools.wraps(func)
@@ -13,18 +15,25 @@ def with_db_connection(func):
     return wrapper
 
 # Task 2 decorator: handle transactions
-def transactional(func):
+# Nested transactional calls on the same connection run in a SAVEPOINT and
+# commit with the outermost one; begin picks DEFERRED/IMMEDIATE/EXCLUSIVE.
+def transactional(func=None, *, begin="IMMEDIATE"):
+    if func is None:
+        return lambda f: transactional(f, begin=begin)
+
     @functools.wraps(func)
     def wrapper(conn, *args, **kwargs):
+        outermost = not conn.in_transaction
         try:
-            result = func(conn, *args, **kwargs)
-            conn.commit()  # commit if no exception
-            print("[LOG] Transaction committed successfully.")
-            return result
+            with atomic(conn, begin):  # commit if no exception
+                result = func(conn, *args, **kwargs)
         except Exception as e:
-            conn.rollback()  # rollback on error
+            # rolled back (to the savepoint, when nested)
             print(f"[ERROR] Transaction rolled back due to: {e}")
             raise  # re-raise the exception
+        if outermost:
+            print("[LOG] Transaction committed successfully.")
+        return result
     return wrapper
 
 @with_db_connection
@@ -36,6 +45,17 @@ def update_user_email(conn, user_id, new_email):
         (new_email, user_id)
     )
 
+# Batched variant: many email updates, one executemany and one commit
+@with_db_connection
+@transactional
+def update_user_emails(conn, updates):
+    cursor = conn.cursor()
+    cursor.executemany(
+        "UPDATE users SET email = ? WHERE id = ?",
+        [(new_email, user_id) for user_id, new_email in updates]
+    )
+    return cursor.rowcount
+
 # Test updating user email
 update_user_email(user_id=1, new_email='Crawford_Cartwright@hotmail.com')
 print("[LOG] User email update finished.")
@@ -1,7 +1,8 @@
-import time
 import sqlite3
 import functools
 
+from retry_policy import RetryPolicy, is_retryable, retry
+
 # Task 1 decorator: handle DB connection
 def with_db_connection(func):
     @functools.wraps(func)
@@ -14,24 +15,33 @@ def with_db_connection(func):
     return wrapper
 
 # Task 3 decorator: retry on failure
-def retry_on_failure(retries=3, delay=2):
+def retry_on_failure(retries=3, delay=2, max_delay=None, deadline=None,
+                     retry_on=is_retryable, breaker=None):
+    """
+    Retry transient database errors (see retry_policy.is_retryable) up to
+    `retries` attempts in total, with full-jitter exponential backoff
+    starting at `delay` seconds. Other errors are raised immediately.
+    """
     def decorator(func):
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            attempt = 0
-            while attempt < retries:
-                try:
-                    return func(*args, **kwargs)
-                except Exception as e:
-                    attempt += 1
-                    print(f"[WARNING] Attempt {attempt} failed: {e}")
-                    if attempt < retries:
-                        print(f"[LOG] Retrying in {delay} seconds...")
-                        time.sleep(delay)
-                    else:
-                        print("[ERROR] All retry attempts failed.")
-                        raise
-        return wrapper
+        def on_retry(attempt, e, wait):
+            print(f"[WARNING] Attempt {attempt} failed: {e}")
+            print(f"[LOG] Retrying in {wait:.2f} seconds...")
+
+        def on_give_up(attempt, e):
+            print(f"[WARNING] Attempt {attempt} failed: {e}")
+            print("[ERROR] All retry attempts failed.")
+
+        policy = RetryPolicy(
+            max_attempts=retries,
+            base_delay=delay,
+            max_delay=delay * 2 ** (retries - 1) if max_delay is None else max_delay,
+            deadline=deadline,
+            retry_on=retry_on,
+            breaker=breaker,
+            on_retry=on_retry,
+            on_give_up=on_give_up,
+        )
+        return retry(func, policy=policy)
     return decorator
 
 @with_db_connection
@@ -2,6 +2,8 @@ import time
 import sqlite3
 import functools
 
+from result_cache import database_path, shared_cache
+
 # Task 1 decorator: handle DB connection
 def with_db_connection(func):
     @functools.wraps(func)
@@ -14,17 +16,26 @@ def with_db_connection(func):
     return wrapper
 
 # Task 4 decorator: cache query results
-query_cache = {}  # global cache dictionary
+# Bounded LRU/TTL cache keyed by (db path, query, params); shared with
+# transactional, which invalidates the tables written by committed writes.
+query_cache = shared_cache
+
+def cache_query(func=None, *, ttl=None):
+    """Cache results per (db path, query, params); use as @cache_query or @cache_query(ttl=60)."""
+    if func is None:
+        return lambda f: cache_query(f, ttl=ttl)
 
-def cache_query(func):
     @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        query = kwargs.get('query') or (args[1] if len(args) > 1 else None)
-        if query in query_cache:
+    def wrapper(conn, *args, **kwargs):
+        query = kwargs.get('query') or (args[0] if args else None)
+        params = kwargs.get('params') or (args[1] if len(args) > 1 else None)
+        key = query_cache.make_key(database_path(conn), query, params)
+        hit, result = query_cache.get(key)
+        if hit:
             print("[LOG] Using cached result.")
-            return query_cache[query]
-        result = func(*args, **kwargs)
-        query_cache[query] = result
+            return result
+        result = func(conn, *args, **kwargs)
+        query_cache.set(key, result, ttl)
         print("[LOG] Query result cached.")
         return result
     return wrapper
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: update_user_email writes/sec with
+- one transaction (and commit) per call on a fresh connection;
+- one transaction per call on pooled WAL connections, from several threads;
+- group commit: the same threads, writes coalesced into batched commits;
+- all calls nested as savepoints inside one outer transaction.
+
+Runs against a throwaway users.db seeded in a temporary directory.
+
+Usage:
+    python3 bench_transactional.py [writes] [threads]
+"""
+
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+USERS = 1000
+
+
+def seed_users(path, users):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, email TEXT, age INTEGER)"
+    )
+    conn.executemany(
+        "INSERT INTO users (name, email, age) VALUES (?, ?, ?)",
+        ((f"User {i}", f"user{i}@example.com", 18 + i % 60) for i in range(users)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def update_user_email(conn, user_id, new_email):
+    conn.execute("UPDATE users SET email = ? WHERE id = ?", (new_email, user_id))
+
+
+def writes_per_sec(func, writes, threads=1):
+    def worker(offset):
+        for i in range(offset, writes, threads):
+            func(user_id=i % USERS + 1, new_email=f"new{i}@example.com")
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # silence the [LOG] lines
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+    return writes / (time.perf_counter() - started)
+
+
+def main():
+    writes = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    sys.path.insert(0, HERE)
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        seed_users("users.db", USERS)
+        with contextlib.redirect_stdout(io.StringIO()):
+            task = __import__('2-transactional')  # runs the task's demo call
+            pooled_task = __import__('1-with_db_connection')
+        from transactions import get_committer, with_group_commit
+
+        per_call = task.with_db_connection(task.transactional(update_user_email))
+        pooled = pooled_task.with_db_connection(pooled=True, pool_size=threads)(
+            task.transactional(update_user_email))
+        grouped = with_group_commit("users.db", max_batch=256)(update_user_email)
+
+        @task.with_db_connection
+        @task.transactional
+        def nested(conn):
+            inner = task.transactional(update_user_email)
+            for i in range(writes):
+                inner(conn, user_id=i % USERS + 1, new_email=f"nested{i}@example.com")
+
+        base = writes_per_sec(per_call, writes)
+        print(f"commit per call:              {base:>10.0f} writes/sec")
+        for label, func, n in (
+            (f"commit per call, pooled x{threads}:", pooled, threads),
+            (f"group commit x{threads}:", grouped, threads),
+        ):
+            rate = writes_per_sec(func, writes, n)
+            print(f"{label:<30}{rate:>10.0f} writes/sec ({rate / base:.1f}x)")
+        stats = get_committer("users.db").stats()
+        print(f"  {stats['commits']} commits, {stats['avg_batch']:.1f} writes/commit")
+
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            nested()
+        rate = writes / (time.perf_counter() - started)
+        print(f"{'savepoints, one commit:':<30}{rate:>10.0f} writes/sec "
+              f"({rate / base:.1f}x)")
+        get_committer("users.db").close()
+        os.chdir(HERE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: get_user_by_id calls/sec with with_db_connection opening a
+connection per call vs. with_db_connection(pooled=True), using a new
+cursor per call or the cached cursor of conn.execute_cached().
+
+Runs against a throwaway users.db seeded in a temporary directory.
+
+Usage:
+    python3 bench_with_db_connection.py [calls] [users]
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def seed_users(path, users):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, email TEXT, age INTEGER)"
+    )
+    conn.executemany(
+        "INSERT INTO users (name, email, age) VALUES (?, ?, ?)",
+        ((f"User {i}", f"user{i}@example.com", 18 + i % 60) for i in range(users)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def calls_per_sec(func, calls, users):
+    started = time.perf_counter()
+    for i in range(calls):
+        func(user_id=i % users + 1)
+    return calls / (time.perf_counter() - started)
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+
+    sys.path.insert(0, HERE)
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        seed_users("users.db", users)
+        task = __import__('1-with_db_connection')  # runs the task's demo call
+
+        def get_user_by_id(conn, user_id):
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+            return cursor.fetchone()
+
+        unpooled = task.with_db_connection(get_user_by_id)
+        pooled = task.with_db_connection(pooled=True)(get_user_by_id)
+        def get_user_by_id_cached(conn, user_id):
+            return conn.execute_cached(
+                "SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
+
+        cached = task.with_db_connection(pooled=True)(get_user_by_id_cached)
+        pooled(user_id=1)  # create the pooled connection outside the timing
+
+        unpooled_rate = calls_per_sec(unpooled, calls, users)
+        print(f"unpooled:          {unpooled_rate:>10.0f} calls/sec")
+        for label, func in (("pooled:", pooled),
+                            ("pooled + cached:", cached)):
+            rate = calls_per_sec(func, calls, users)
+            print(f"{label:<19}{rate:>10.0f} calls/sec "
+                  f"({rate / unpooled_rate:.1f}x)")
+        os.chdir(HERE)
+
+
+if __name__ == "__main__":
+    main()
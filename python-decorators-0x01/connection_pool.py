@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+connection_pool.py
+Pooled, reusable sqlite3 connections for the with_db_connection decorators.
+
+Opening a sqlite connection per call pays the file open, schema parse and
+page-cache warmup every time. A SQLitePool keeps up to `size` connections
+open per database file:
+- a thread gets back the connection it used last when it is idle, and a
+  nested decorated call on the same thread reuses the connection already
+  checked out by the outer call;
+- WAL mode and the other pragmas are applied once, when a connection is
+  created, not on every call;
+- connections are statement_cache.CachedConnection objects, so prepared
+  statements and cursors are reused across calls (see statement_cache.py).
+
+Usage:
+    @with_pooled_connection("users.db", size=5)
+    def get_user_by_id(conn, user_id):
+        ...
+"""
+
+import functools
+import sqlite3
+import threading
+import time
+
+from statement_cache import DEFAULT_SIZE, CachedConnection
+
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "foreign_keys": "ON",
+}
+
+
+class PoolTimeout(sqlite3.OperationalError):
+    """No pooled connection became free within the acquire timeout."""
+
+
+class SQLitePool:
+    """Thread-safe pool of sqlite3 connections to one database file."""
+
+    def __init__(self, database="users.db", size=5, pragmas=None, timeout=5.0,
+                 cached_statements=DEFAULT_SIZE):
+        self.database = database
+        self.size = size
+        self.pragmas = DEFAULT_PRAGMAS if pragmas is None else pragmas
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self._idle = []
+        self._open = 0
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self.created = 0
+        self.checkouts = 0
+        self.reuses = 0
+
+    def acquire(self):
+        """Check out a connection for the current thread."""
+        local = self._local
+        if getattr(local, "depth", 0):
+            # nested call on the same thread: share the outer connection
+            local.depth += 1
+            return local.conn
+
+        conn = self._checkout()
+        local.conn, local.depth = conn, 1
+        return conn
+
+    def release(self, conn):
+        """Give back a connection obtained from acquire()."""
+        local = self._local
+        local.depth -= 1
+        if local.depth:
+            return
+        local.conn = None
+        if conn.in_transaction:
+            conn.rollback()
+        with self._cond:
+            if self._open > self.size:
+                # pool was shrunk or closed while this connection was out
+                self._open -= 1
+                conn.close()
+                return
+            local.last = conn
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def connection(self):
+        """Context manager: `with pool.connection() as conn: ...`."""
+        return _Lease(self)
+
+    def close(self):
+        """Close idle connections; connections in use close when released."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self.size = 0
+        for conn in idle:
+            conn.close()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "size": self.size,
+                "open": self._open,
+                "idle": len(self._idle),
+                "created": self.created,
+                "checkouts": self.checkouts,
+                "reuses": self.reuses,
+            }
+
+    def _checkout(self):
+        deadline = time.monotonic() + self.timeout
+        last = getattr(self._local, "last", None)
+        with self._cond:
+            while True:
+                if self._idle:
+                    # prefer the connection this thread used last (warm cache)
+                    if last is not None and last in self._idle:
+                        self._idle.remove(last)
+                        conn = last
+                    else:
+                        conn = self._idle.pop()
+                    self.checkouts += 1
+                    self.reuses += 1
+                    return conn
+                if self._open < self.size:
+                    self._open += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(
+                        f"No free connection to {self.database} "
+                        f"after {self.timeout}s"
+                    )
+                self._cond.wait(remaining)
+
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.created += 1
+            self.checkouts += 1
+        return conn
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.database,
+            check_same_thread=False,
+            factory=CachedConnection,
+            cached_statements=self.cached_statements,
+        )
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+
+class _Lease:
+    def __init__(self, pool):
+        self.pool = pool
+        self.conn = None
+
+    def __enter__(self):
+        self.conn = self.pool.acquire()
+        return self.conn
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.pool.release(self.conn)
+        return False
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(database="users.db", size=None, pragmas=None):
+    """
+    Return the shared pool for a database file, creating it on first use
+    (size defaults to 5, pragmas to DEFAULT_PRAGMAS). Asking for a size or
+    pragmas other than the existing pool's raises ValueError instead of
+    silently handing back a differently configured pool.
+    """
+    with _pools_lock:
+        pool = _pools.get(database)
+        if pool is None:
+            pool = _pools[database] = SQLitePool(
+                database, 5 if size is None else size, pragmas)
+            return pool
+    if size is not None and size != pool.size:
+        raise ValueError(
+            f"shared pool for {database} already has size {pool.size}, not {size}")
+    if pragmas is not None and pragmas != pool.pragmas:
+        raise ValueError(
+            f"shared pool for {database} already uses pragmas {pool.pragmas}")
+    return pool
+
+
+def with_pooled_connection(database="users.db", size=None, pragmas=None):
+    """
+    Decorator factory: like with_db_connection, but the connection passed
+    as first argument comes from the shared pool for `database`.
+    """
+    def decorator(func):
+        pool = None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            nonlocal pool
+            if pool is None:
+                pool = get_pool(database, size, pragmas)
+            conn = pool.acquire()
+            try:
+                return func(conn, *args, **kwargs)
+            finally:
+                pool.release(conn)
+        return wrapper
+    return decorator
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+query_metrics.py
+Low-overhead query instrumentation in an in-process registry.
+
+@instrument_queries records, per normalized query fingerprint, a latency
+histogram, call/error/row counters and a ring of slow-query samples. It
+works on plain functions (the sqlite decorators), generator functions
+(shaped like the MySQL streaming generators: timed until exhausted or
+closed, rows = items yielded, or batch lengths), coroutines (shaped like
+the aiosqlite functions) and async generators. A consumer that stops
+iterating early is not counted as an error.
+
+Only log_queries applies it in this directory; the other exercise
+directories do not import from this one.
+
+With sample_rate < 1 only that fraction of calls is timed and recorded
+(the rest run with no instrumentation at all); recorded calls are weighted
+by 1 / sample_rate so counters still estimate totals.
+
+Export with registry.to_json() or registry.to_prometheus().
+
+Usage:
+    @instrument_queries(sample_rate=0.1, slow_threshold=0.05)
+    def fetch_all_users(query): ...
+
+    @instrument_queries(query="SELECT age FROM user_data")
+    def stream_user_ages(): ...
+"""
+
+import functools
+import inspect
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+
+# Histogram bucket upper bounds, in seconds.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|\?|:\w+")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=2048)
+def fingerprint(query):
+    """Normalize a query: literals and placeholders become ?, lists collapse."""
+    text = _STRING.sub("?", query)
+    text = _NUMBER.sub("?", text)
+    text = _PLACEHOLDER.sub("?", text)
+    text = _IN_LIST.sub("(?+)", text)
+    return _SPACES.sub(" ", text).strip().rstrip(";")
+
+
+class _QueryStats:
+    __slots__ = ("buckets", "count", "total", "errors", "rows", "max")
+
+    def __init__(self, bucket_count):
+        self.buckets = [0.0] * (bucket_count + 1)  # last one is +Inf
+        self.count = 0.0
+        self.total = 0.0
+        self.errors = 0.0
+        self.rows = 0.0
+        self.max = 0.0
+
+
+class MetricsRegistry:
+    """Thread-safe store of per-fingerprint query metrics."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, slow_samples=50):
+        self.bucket_bounds = tuple(buckets)
+        self._stats = {}
+        self._slow = deque(maxlen=slow_samples)
+        self._lock = threading.Lock()
+
+    def observe(self, query, duration, rows=0, error=False, weight=1.0,
+                slow_threshold=None):
+        """Record one execution of query that took duration seconds."""
+        key = fingerprint(query) if query else "<unknown>"
+        index = len(self.bucket_bounds)
+        for i, bound in enumerate(self.bucket_bounds):
+            if duration <= bound:
+                index = i
+                break
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _QueryStats(len(self.bucket_bounds))
+            stats.buckets[index] += weight
+            stats.count += weight
+            stats.total += duration * weight
+            stats.rows += rows * weight
+            if error:
+                stats.errors += weight
+            if duration > stats.max:
+                stats.max = duration
+            if slow_threshold is not None and duration >= slow_threshold:
+                self._slow.append({
+                    "fingerprint": key,
+                    "query": query,
+                    "duration": duration,
+                    "rows": rows,
+                    "at": time.time(),
+                })
+
+    def snapshot(self):
+        """Return metrics as plain dicts, keyed by fingerprint."""
+        with self._lock:
+            queries = {}
+            for key, stats in self._stats.items():
+                cumulative, buckets = 0.0, {}
+                for bound, value in zip(self.bucket_bounds + ("+Inf",),
+                                        stats.buckets):
+                    cumulative += value
+                    buckets[str(bound)] = round(cumulative)
+                queries[key] = {
+                    "count": round(stats.count),
+                    "errors": round(stats.errors),
+                    "rows": round(stats.rows),
+                    "total_seconds": stats.total,
+                    "avg_seconds": stats.total / stats.count if stats.count else 0.0,
+                    "max_seconds": stats.max,
+                    "buckets": buckets,
+                }
+            return {"queries": queries, "slow_queries": list(self._slow)}
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.snapshot(), **kwargs)
+
+    def to_prometheus(self, prefix="db_query"):
+        """Render metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()["queries"]
+        lines = [
+            f"# HELP {prefix}_duration_seconds Query latency.",
+            f"# TYPE {prefix}_duration_seconds histogram",
+        ]
+        for key, stats in snapshot.items():
+            label = f'fingerprint="{_escape(key)}"'
+            for bound, value in stats["buckets"].items():
+                lines.append(
+                    f'{prefix}_duration_seconds_bucket{{{label},le="{bound}"}} {value}'
+                )
+            lines.append(f"{prefix}_duration_seconds_sum{{{label}}} {stats['total_seconds']}")
+            lines.append(f"{prefix}_duration_seconds_count{{{label}}} {stats['count']}")
+        for name, field, text in (("rows_total", "rows", "Rows returned."),
+                                  ("errors_total", "errors", "Failed queries.")):
+            lines.append(f"# HELP {prefix}_{name} {text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for key, stats in snapshot.items():
+                lines.append(
+                    f'{prefix}_{name}{{fingerprint="{_escape(key)}"}} {stats[field]}'
+                )
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._slow.clear()
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = MetricsRegistry()
+
+
+def _count_rows(result):
+    if result is None:
+        return 0
+    if isinstance(result, list):
+        return len(result)
+    return 1
+
+
+def _query_of(args, kwargs):
+    """Find the SQL among the call arguments (query= or a str positional)."""
+    query = kwargs.get("query")
+    if query is None:
+        for arg in args:
+            if isinstance(arg, str):
+                return arg
+    return query
+
+
+def instrument_queries(func=None, *, query=None, sample_rate=1.0,
+                       slow_threshold=0.1, registry=registry):
+    """
+    Decorator recording latency, rows and errors of each (sampled) call.
+    query labels the call when the SQL is not one of its arguments.
+    """
+    if func is None:
+        return lambda f: instrument_queries(
+            f, query=query, sample_rate=sample_rate,
+            slow_threshold=slow_threshold, registry=registry)
+
+    weight = 1.0 / sample_rate if sample_rate > 0 else 0.0
+
+    def sampled():
+        return sample_rate >= 1.0 or random.random() < sample_rate
+
+    def record(args, kwargs, started, rows, error):
+        registry.observe(
+            query or _query_of(args, kwargs), time.perf_counter() - started,
+            rows, error, weight, slow_threshold,
+        )
+
+    if inspect.isasyncgenfunction(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not sampled():
+                async for item in func(*args, **kwargs):
+                    yield item
+                return
+            started, rows, error = time.perf_counter(), 0, False
+            try:
+                async for item in func(*args, **kwargs):
+                    rows += len(item) if isinstance(item, list) else 1
+                    yield item
+            except GeneratorExit:
+                raise
+            except BaseException:
+                error = True
+                raise
+            finally:
+                record(args, kwargs, started, rows, error)
+
+    elif inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not sampled():
+                return await func(*args, **kwargs)
+            started, rows, error = time.perf_counter(), 0, False
+            try:
+                result = await func(*args, **kwargs)
+                rows = _count_rows(result)
+                return result
+            except BaseException:
+                error = True
+                raise
+            finally:
+                record(args, kwargs, started, rows, error)
+
+    elif inspect.isgeneratorfunction(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not sampled():
+                return (yield from func(*args, **kwargs))
+            started, rows, error = time.perf_counter(), 0, False
+            try:
+                for item in func(*args, **kwargs):
+                    rows += len(item) if isinstance(item, list) else 1
+                    yield item
+            except GeneratorExit:
+                raise
+            except BaseException:
+                error = True
+                raise
+            finally:
+                record(args, kwargs, started, rows, error)
+
+    else:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not sampled():
+                return func(*args, **kwargs)
+            started, rows, error = time.perf_counter(), 0, False
+            try:
+                result = func(*args, **kwargs)
+                rows = _count_rows(result)
+                return result
+            except BaseException:
+                error = True
+                raise
+            finally:
+                record(args, kwargs, started, rows, error)
+
+    return wrapper
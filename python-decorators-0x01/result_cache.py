@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+result_cache.py
+Bounded, thread-safe cache of query results used by cache_query.
+
+- Keys are (database path, query, params), so the same SQL against another
+  database or with other parameters is never served from the wrong entry.
+  Whitespace is collapsed outside string literals and comments only, and
+  named parameters key on their names and values.
+- Entries are evicted least-recently-used once max_entries or max_bytes
+  (estimated result size) is exceeded, and expire after their TTL.
+- Every entry remembers the tables its query reads; writes committed
+  through transactional invalidate the entries of the tables they touch.
+- hits/misses/evictions/expirations/invalidations are counted for stats().
+"""
+
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from collections.abc import Mapping
+
+_READ_TABLES = re.compile(r'\b(?:FROM|JOIN)\s+["`\[]?(\w+)', re.IGNORECASE)
+_WRITE_TABLE = re.compile(
+    r'^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?'
+    r'|DELETE\s+FROM)\s+["`\[]?(\w+)',
+    re.IGNORECASE
+)
+
+# Kept verbatim by query_key: string literals, quoted identifiers and
+# comments (a -- comment keeps the newline that ends it).
+_VERBATIM = re.compile(
+    r"""('(?:[^']|'')*'|"(?:[^"]|"")*"|--[^\n]*\n?|/\*.*?\*/)""", re.DOTALL)
+_SPACES = re.compile(r"\s+")
+
+
+def query_key(query):
+    """Return query with runs of whitespace collapsed outside literals and comments."""
+    parts = _VERBATIM.split(query)
+    parts[::2] = [_SPACES.sub(" ", part) for part in parts[::2]]
+    return "".join(parts).strip()
+
+
+def params_key(params):
+    """Return a hashable key for positional (sequence) or named (mapping) params."""
+    if params is None:
+        return ()
+    if isinstance(params, Mapping):
+        return tuple(sorted(params.items()))
+    return tuple(params)
+
+
+def tables_read(query):
+    """Return the lower-cased table names a SELECT reads from."""
+    return {name.lower() for name in _READ_TABLES.findall(query)}
+
+
+def table_written(statement):
+    """Return the lower-cased table an INSERT/UPDATE/DELETE writes, or None."""
+    match = _WRITE_TABLE.match(statement)
+    return match.group(1).lower() if match else None
+
+
+def database_path(conn):
+    """Return the file path of a sqlite3 connection's main database."""
+    for _, name, path in conn.execute("PRAGMA database_list"):
+        if name == "main":
+            return path or ":memory:"
+    return ":memory:"
+
+
+def estimate_size(value):
+    """Rough size in bytes of a query result (list of row tuples)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        for row in value:
+            size += sys.getsizeof(row)
+            if isinstance(row, (list, tuple)):
+                size += sum(sys.getsizeof(item) for item in row)
+    return size
+
+
+class _Entry:
+    __slots__ = ("value", "size", "expires_at", "tables")
+
+    def __init__(self, value, size, expires_at, tables):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.tables = tables
+
+
+class QueryCache:
+    """LRU + TTL cache of query results with table-level invalidation."""
+
+    def __init__(self, max_entries=1024, max_bytes=16 * 1024 * 1024, ttl=300):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._by_table = defaultdict(set)  # (database, table) -> keys
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(database, query, params=None):
+        return database, query_key(query), params_key(params)
+
+    def get(self, key):
+        """Return (True, value) on a fresh hit, (False, None) otherwise."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry.value
+
+    def set(self, key, value, ttl=None):
+        """Store value under key, evicting least recently used entries."""
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        database, query, _ = key
+        tables = {(database, table) for table in tables_read(query)}
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(value, size, time.monotonic() + ttl, tables)
+            self._bytes += size
+            for table in tables:
+                self._by_table[table].add(key)
+            while (len(self._entries) > self.max_entries
+                   or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_tables(self, database, tables):
+        """Drop every entry of `database` that reads one of `tables`."""
+        with self._lock:
+            for table in tables:
+                for key in list(self._by_table.get((database, table.lower()), ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_table.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Return a snapshot of size and hit/miss/eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        for table in entry.tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
+
+
+# Shared by cache_query and transactional so committed writes invalidate
+# cached reads.
+shared_cache = QueryCache()
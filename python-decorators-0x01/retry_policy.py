@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+retry_policy.py
+Retry engine behind retry_on_failure.
+
+- Only transient errors are retried (is_retryable): sqlite busy/locked,
+  MySQL deadlock / lock wait timeout / lost connection, and connection or
+  timeout errors. Syntax errors, constraint violations, ... raise at once.
+- Delays grow exponentially with full jitter (a random delay between 0 and
+  base_delay * 2**n, capped at max_delay), so callers contending for the
+  same lock do not retry in lockstep.
+- deadline caps the total time spent on one call, sleeps included.
+- A CircuitBreaker, optionally shared by several policies, fails fast with
+  CircuitOpenError after failure_threshold consecutive transient failures,
+  then lets one trial call through after reset_timeout.
+- retry() wraps coroutine functions with an asyncio.sleep based loop.
+- policy.stats() counts calls, attempts, retries, successes, give-ups,
+  non-retryable errors and short-circuited calls.
+
+Usage:
+    @retry(max_attempts=5, base_delay=0.05, deadline=2.0)
+    def fetch_users(conn): ...
+"""
+
+import asyncio
+import functools
+import random
+import sqlite3
+import threading
+import time
+
+# sqlite primary result codes (extended codes keep them in the low byte)
+SQLITE_BUSY = 5
+SQLITE_LOCKED = 6
+SQLITE_TRANSIENT_MESSAGES = ("database is locked", "database is busy",
+                             "database table is locked")
+
+# MySQL server / client error numbers worth retrying
+MYSQL_TRANSIENT_ERRNOS = {
+    1205,  # ER_LOCK_WAIT_TIMEOUT
+    1213,  # ER_LOCK_DEADLOCK
+    2006,  # CR_SERVER_GONE_ERROR
+    2013,  # CR_SERVER_LOST
+    2055,  # CR_SERVER_LOST_EXTENDED
+}
+
+
+def is_retryable(exc):
+    """Return True if exc is a transient database error worth retrying."""
+    if isinstance(exc, sqlite3.OperationalError):
+        code = getattr(exc, "sqlite_errorcode", None)
+        if code is not None:
+            return code & 0xFF in (SQLITE_BUSY, SQLITE_LOCKED)
+        message = str(exc).lower()
+        return any(text in message for text in SQLITE_TRANSIENT_MESSAGES)
+    if isinstance(exc, sqlite3.Error):
+        return False
+    # mysql.connector errors carry .errno; PyMySQL/aiomysql put it in args[0]
+    errno = getattr(exc, "errno", None)
+    if errno is None and exc.args and isinstance(exc.args[0], int):
+        errno = exc.args[0]
+    if errno in MYSQL_TRANSIENT_ERRNOS:
+        return True
+    return isinstance(exc, (ConnectionError, TimeoutError))
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the function while the circuit is open."""
+
+
+class CircuitBreaker:
+    """Opens after failure_threshold consecutive failures, for reset_timeout s."""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._trial_started = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Return True if a call may go through now."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._trial_running = False
+            now = time.monotonic()
+            # a trial that never reported back frees its slot after reset_timeout
+            if (self._trial_running
+                    and now - self._trial_started < self.reset_timeout):
+                return False
+            self._trial_running = True
+            self._trial_started = now
+            return True
+
+    def release_trial(self):
+        """Give back a half-open trial that ended without a verdict (e.g. cancelled)."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if (self.state == self.HALF_OPEN
+                    or self.failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class RetryPolicy:
+    """How often, how long and on which errors a call is retried."""
+
+    def __init__(self, max_attempts=3, base_delay=0.05, max_delay=2.0,
+                 deadline=None, retry_on=is_retryable, breaker=None,
+                 on_retry=None, on_give_up=None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retry_on = retry_on
+        self.breaker = breaker
+        self.on_retry = on_retry
+        self.on_give_up = on_give_up
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(
+            ("calls", "attempts", "retries", "successes", "give_ups",
+             "non_retryable", "short_circuited", "abandoned"), 0)
+
+    def backoff(self, attempt):
+        """Full-jitter delay before retry number `attempt` (1-based)."""
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+    def call(self, func, *args, **kwargs):
+        """Run func with retries, sleeping with time.sleep between attempts."""
+        started = self._start()
+        attempt = 0
+        try:
+            while True:
+                attempt += 1
+                self._count("attempts")
+                try:
+                    result = func(*args, **kwargs)
+                except Exception as exc:
+                    delay = self._on_failure(exc, attempt, started)
+                    time.sleep(delay)
+                    continue
+                self._on_success()
+                return result
+        except Exception:
+            raise  # already recorded by _on_failure
+        except BaseException:
+            self._on_abandon()
+            raise
+
+    async def call_async(self, func, *args, **kwargs):
+        """Await func(*args, **kwargs) with retries, sleeping with asyncio.sleep."""
+        started = self._start()
+        attempt = 0
+        try:
+            while True:
+                attempt += 1
+                self._count("attempts")
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as exc:
+                    delay = self._on_failure(exc, attempt, started)
+                    await asyncio.sleep(delay)
+                    continue
+                self._on_success()
+                return result
+        except Exception:
+            raise  # already recorded by _on_failure
+        except BaseException:
+            self._on_abandon()
+            raise
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        if self.breaker is not None:
+            stats["circuit"] = self.breaker.state
+        return stats
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _start(self):
+        self._count("calls")
+        if self.breaker is not None and not self.breaker.allow():
+            self._count("short_circuited")
+            raise CircuitOpenError("circuit open: failing fast")
+        return time.monotonic()
+
+    def _on_success(self):
+        self._count("successes")
+        if self.breaker is not None:
+            self.breaker.record_success()
+
+    def _on_abandon(self):
+        """Cancelled or interrupted: no verdict on the database either way."""
+        self._count("abandoned")
+        if self.breaker is not None:
+            self.breaker.release_trial()
+
+    def _on_failure(self, exc, attempt, started):
+        """Return the delay before the next attempt, or re-raise exc."""
+        if not self.retry_on(exc):
+            self._count("non_retryable")
+            if self.breaker is not None:
+                # the database answered; only the request was bad
+                self.breaker.record_success()
+            raise exc
+        if self.breaker is not None:
+            self.breaker.record_failure()
+
+        delay = self.backoff(attempt)
+        out_of_time = (self.deadline is not None
+                       and time.monotonic() - started + delay > self.deadline)
+        circuit_open = self.breaker is not None and not self.breaker.allow()
+        if attempt >= self.max_attempts or out_of_time or circuit_open:
+            self._count("give_ups")
+            if self.on_give_up is not None:
+                self.on_give_up(attempt, exc)
+            raise exc
+
+        self._count("retries")
+        if self.on_retry is not None:
+            self.on_retry(attempt, exc, delay)
+        return delay
+
+
+def retry(func=None, *, policy=None, **options):
+    """
+    Decorator retrying transient failures of func according to policy
+    (or a RetryPolicy built from options). Coroutine functions get the
+    asyncio variant.
+    """
+    if func is None:
+        return lambda f: retry(f, policy=policy, **options)
+    policy = policy or RetryPolicy(**options)
+
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await policy.call_async(func, *args, **kwargs)
+    else:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return policy.call(func, *args, **kwargs)
+    wrapper.retry_policy = policy
+    return wrapper
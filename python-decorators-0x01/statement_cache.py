@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+statement_cache.py
+Prepared-statement and cursor reuse for decorated query functions.
+
+sqlite3 keeps an LRU of prepared statements per connection (sized by
+`cached_statements`), but a connection opened per call starts with an empty
+one and re-parses every statement. Pooled connections (connection_pool)
+live across calls and are CachedConnection objects:
+- their prepared-statement cache size is configurable (pool option
+  `cached_statements`);
+- conn.execute_cached(sql, params) also reuses one cursor per SQL string
+  from a StatementCache, a bounded LRU of the same size with
+  hit/miss/eviction counters (conn.statement_cache.stats()).
+
+    @with_db_connection(pooled=True)
+    def get_user_by_id(conn, user_id):
+        return conn.execute_cached(
+            "SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
+
+execute_batch() sends many parameter sets for one statement with
+executemany inside a single transaction (one commit instead of N), or
+inside a savepoint when the caller already has a transaction open.
+"""
+
+import sqlite3
+from collections import OrderedDict
+
+DEFAULT_SIZE = 128
+
+
+class StatementCache:
+    """
+    Bounded LRU of reusable cursors, one per SQL string, for one connection.
+    Executing a statement again resets its cursor, so finish reading a
+    result before running the same SQL a second time.
+    """
+
+    def __init__(self, conn, size=DEFAULT_SIZE):
+        self.conn = conn
+        self.size = size
+        self._cursors = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def cursor_for(self, sql):
+        """Return the cursor reserved for sql, creating it on a miss."""
+        cursor = self._cursors.get(sql)
+        if cursor is not None:
+            self._cursors.move_to_end(sql)
+            self.hits += 1
+            return cursor
+        self.misses += 1
+        cursor = self._cursors[sql] = self.conn.cursor()
+        if len(self._cursors) > self.size:
+            _, evicted = self._cursors.popitem(last=False)
+            evicted.close()
+            self.evictions += 1
+        return cursor
+
+    def execute(self, sql, params=()):
+        """Execute sql on its cached cursor and return that cursor."""
+        return self.cursor_for(sql).execute(sql, params)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": self.size,
+            "statements": len(self._cursors),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+    def clear(self):
+        for cursor in self._cursors.values():
+            cursor.close()
+        self._cursors.clear()
+
+
+class CachedConnection(sqlite3.Connection):
+    """sqlite3 connection that owns a StatementCache sized like its statement cache."""
+
+    def __init__(self, *args, cached_statements=DEFAULT_SIZE, **kwargs):
+        super().__init__(*args, cached_statements=cached_statements, **kwargs)
+        self.statement_cache = StatementCache(self, cached_statements)
+
+    def execute_cached(self, sql, params=()):
+        """Like execute(), but reuses this statement's cursor and counts hits."""
+        return self.statement_cache.execute(sql, params)
+
+
+def execute_batch(conn, sql, seq_of_params):
+    """
+    Run sql once per parameter set with executemany inside one transaction,
+    committing once; rolls back everything if any row fails. Inside an
+    open transaction (e.g. @transactional) the batch runs in a savepoint
+    and commits with the caller's transaction.
+    Returns the number of rows changed.
+    """
+    # transactions imports connection_pool, which imports this module
+    from transactions import atomic
+
+    cache = getattr(conn, "statement_cache", None)
+    cursor = cache.cursor_for(sql) if cache is not None else conn.cursor()
+    with atomic(conn):
+        cursor.executemany(sql, seq_of_params)
+    return cursor.rowcount
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+transactions.py
+Nested transactions and group commit for the transactional decorator.
+
+atomic(conn) opens a real transaction on the outermost call, with
+BEGIN IMMEDIATE by default so the write lock is taken up front instead
+of failing later with "database is locked" when a reader tries to upgrade.
+A nested atomic() on the same connection becomes a SAVEPOINT. Its failure
+rolls back only its own work, and its success commits nothing until the
+outer transaction does. Tables written inside the transaction are
+invalidated in result_cache.shared_cache once it commits (for a
+transaction the caller opened itself, when its COMMIT runs).
+
+A GroupCommitter runs write functions from many callers on one writer
+connection. It coalesces them into a single transaction of up to
+max_batch calls (waiting up to `window` seconds for more), so N writes
+pay for one commit/fsync instead of N. Each call runs in its own
+savepoint, so one failing call does not discard the rest of the batch.
+Callers block until their batch has committed. If the writer thread
+dies (the database cannot be opened, or a call raises a BaseException),
+the calls in flight and in the queue fail with its error, and later
+submits raise WriterStopped.
+
+Usage:
+    @with_group_commit("users.db", max_batch=64)
+    def update_user_email(conn, user_id, new_email): ...
+"""
+
+import functools
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+from connection_pool import DEFAULT_PRAGMAS
+from result_cache import database_path, shared_cache, table_written
+
+BEGIN_MODES = ("DEFERRED", "IMMEDIATE", "EXCLUSIVE")
+
+
+class WriterStopped(RuntimeError):
+    """The GroupCommitter's writer thread died; no more calls are accepted."""
+
+
+class _State:
+    __slots__ = ("depth", "written")
+
+    def __init__(self):
+        self.depth = 0
+        self.written = set()
+
+
+# id(conn) -> _State for connections inside atomic(); sqlite3.Connection
+# takes neither attributes nor weak references.
+_states = {}
+# id(conn) -> tables written by atomic() blocks inside a transaction the
+# caller opened, invalidated once that transaction commits.
+_pending = {}
+_states_lock = threading.Lock()
+
+
+@contextmanager
+def atomic(conn, begin="IMMEDIATE"):
+    """
+    Run the block in a transaction, or in a savepoint when already inside
+    one on this connection. Commits / releases on success, rolls back on error.
+    """
+    with _states_lock:
+        state = _states.get(id(conn))
+        if state is None:
+            state = _states[id(conn)] = _State()
+    outermost = state.depth == 0
+    owns_transaction = outermost and not conn.in_transaction
+    state.depth += 1
+    savepoint = f"sp_{state.depth}"
+    watching = False
+
+    if outermost:
+        if not owns_transaction:
+            with _states_lock:
+                state.written.update(_pending.pop(id(conn), ()))
+        def track_writes(statement):
+            table = table_written(statement)
+            if table:
+                state.written.add(table)
+        conn.set_trace_callback(track_writes)
+
+    try:
+        if owns_transaction:
+            if begin.upper() not in BEGIN_MODES:
+                raise ValueError(f"begin must be one of {BEGIN_MODES}")
+            conn.execute(f"BEGIN {begin}")
+        else:
+            conn.execute(f"SAVEPOINT {savepoint}")
+        try:
+            yield conn
+        except BaseException:
+            if owns_transaction:
+                conn.rollback()
+            else:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+            raise
+        if owns_transaction:
+            conn.commit()
+            if state.written:
+                # drop cached reads of the tables this transaction changed
+                shared_cache.invalidate_tables(database_path(conn), state.written)
+        else:
+            conn.execute(f"RELEASE {savepoint}")
+            if outermost and state.written:
+                # nothing is committed until the caller's transaction is
+                _invalidate_on_commit(conn, state.written)
+                watching = True
+    finally:
+        state.depth -= 1
+        if outermost:
+            if not watching:
+                conn.set_trace_callback(None)
+            with _states_lock:
+                del _states[id(conn)]
+
+
+def _invalidate_on_commit(conn, written):
+    """
+    Keep tracing conn until the transaction its caller opened ends:
+    invalidate the written tables on COMMIT, forget them on ROLLBACK.
+    """
+    database = database_path(conn)
+    with _states_lock:
+        _pending[id(conn)] = written
+
+    def watch(statement):
+        words = statement.upper().split(None, 3)
+        with _states_lock:
+            if _pending.get(id(conn)) is not written:
+                return  # settled, or taken over by a later atomic()
+            if words and words[0] in ("COMMIT", "END"):
+                del _pending[id(conn)]
+            elif words and words[0] == "ROLLBACK" and "TO" not in words[1:3]:
+                del _pending[id(conn)]
+                return
+            else:
+                table = table_written(statement)
+                if table:
+                    written.add(table)
+                return
+        shared_cache.invalidate_tables(database, written)
+
+    conn.set_trace_callback(watch)
+
+
+class GroupCommitter:
+    """One writer thread that commits the calls submitted to it in batches."""
+
+    def __init__(self, database="users.db", max_batch=64, window=0.0,
+                 begin="IMMEDIATE", pragmas=None):
+        self.database = database
+        self.max_batch = max_batch
+        self.window = window
+        self.begin = begin
+        self.pragmas = DEFAULT_PRAGMAS if pragmas is None else pragmas
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._error = None  # why the writer thread died
+        self.commits = 0
+        self.writes = 0
+
+    def submit(self, func, *args, **kwargs):
+        """Queue func(conn, *args, **kwargs); the Future resolves after commit."""
+        future = Future()
+        with self._lock:
+            if self._error is not None:
+                raise WriterStopped(
+                    f"group-commit writer for {self.database} stopped"
+                ) from self._error
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=f"group-commit:{self.database}",
+                    daemon=True)
+                self._thread.start()
+            # under the lock, so nothing is queued after _fail() drains
+            self._queue.put((future, func, args, kwargs))
+        return future
+
+    def call(self, func, *args, **kwargs):
+        """Run func in the next batch and return its result once committed."""
+        return self.submit(func, *args, **kwargs).result()
+
+    def close(self):
+        """Commit what is queued, then stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def stats(self):
+        return {
+            "commits": self.commits,
+            "writes": self.writes,
+            "avg_batch": self.writes / self.commits if self.commits else 0.0,
+        }
+
+    def _run(self):
+        conn = None
+        batch = []
+        try:
+            conn = sqlite3.connect(self.database, check_same_thread=False)
+            for name, value in self.pragmas.items():
+                conn.execute(f"PRAGMA {name} = {value}")
+            while True:
+                batch, stop = self._next_batch()
+                if batch:
+                    self._commit_batch(conn, batch)
+                    batch = []
+                if stop:
+                    return
+        except BaseException as e:
+            self._fail(batch, e)
+            raise
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _fail(self, batch, error):
+        """Fail the batch in flight and every queued call; refuse new ones."""
+        with self._lock:
+            self._error = error
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                batch.append(item)
+        for future, *_ in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    def _next_batch(self):
+        """Block for one call, then take more until max_batch or the window ends."""
+        item = self._queue.get()
+        if item is None:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            try:
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _commit_batch(self, conn, batch):
+        outcomes = []
+        try:
+            with atomic(conn, self.begin):
+                for future, func, args, kwargs in batch:
+                    try:
+                        with atomic(conn):
+                            outcomes.append((future, func(conn, *args, **kwargs), None))
+                    except Exception as e:
+                        outcomes.append((future, None, e))
+        except Exception as e:
+            # the commit itself failed: nothing in the batch was written
+            for future, *_ in batch:
+                future.set_exception(e)
+            return
+        self.commits += 1
+        self.writes += len(batch)
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+
+_committers = {}
+_committers_lock = threading.Lock()
+
+
+def get_committer(database="users.db", **options):
+    """Return the shared GroupCommitter for a database file."""
+    with _committers_lock:
+        committer = _committers.get(database)
+        if committer is None:
+            committer = _committers[database] = GroupCommitter(database, **options)
+        return committer
+
+
+def with_group_commit(database="users.db", **options):
+    """
+    Decorator factory: the function gets the group-commit writer connection
+    as first argument and returns once its batch has committed.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return get_committer(database, **options).call(func, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -2,14 +2,183 @@
 """
 Generator that streams rows from the user_data table
 one by one using yield.
+
+Besides the default dict rows, rows can be yielded as plain tuples,
+namedtuples or __slots__ records (no per-row dict), optionally keeping only
+some columns and validating them. Large files can be split into byte ranges
+read through mmap, one range per parallel reader.
 """
 
 import csv
+import keyword
+import mmap
+import os
+from collections import namedtuple
+from operator import itemgetter
+
+RECORD_TYPES = ("dict", "tuple", "namedtuple", "slots")
+
+
+def stream_users(source="user_data.csv", record="dict", columns=None,
+                 validate=False):
+    """
+    Generator that yields one user at a time from a CSV path or file object.
+
+    - record: "dict" (csv.DictReader rows), "tuple", "namedtuple" or "slots".
+    - columns: only keep these columns, in this order.
+    - validate: skip rows with a wrong field count or a non-integer age,
+      and convert age to int.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, newline='', encoding="utf-8") as csvfile:
+            yield from stream_users(csvfile, record, columns, validate)
+        return
+
+    if record == "dict" and columns is None and not validate:
+        yield from csv.DictReader(source)
+        return
+
+    reader = csv.reader(source)
+    header = next(reader, None)
+    if header is None:
+        return
+    yield from _records(reader, header, record, columns, validate)
+
+
+def split_byte_ranges(path, parts):
+    """
+    Split the data lines of a CSV file into about `parts` byte ranges
+    [start, end) that begin and end on line boundaries, for parallel readers.
+    Assumes no quoted field contains a newline.
+    """
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            first = mm.find(b"\n") + 1 or size
+            step = max(1, -(-(size - first) // max(1, parts)))
+            ranges = []
+            start = first
+            while start < size:
+                end = mm.find(b"\n", min(start + step, size) - 1)
+                end = size if end == -1 else end + 1
+                ranges.append((start, end))
+                start = end
+            return ranges
+
+
+def stream_users_range(path, start, end, record="tuple", columns=None,
+                       validate=False):
+    """
+    Generator that yields the users stored in bytes [start, end) of a CSV
+    file (see split_byte_ranges), reading them through mmap.
+    """
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            header_end = mm.find(b"\n")
+            header_line = mm[:header_end if header_end != -1 else len(mm)]
+            header = next(csv.reader([header_line.decode("utf-8")]))
+            if header_end == -1:
+                return
+            lines = _mmap_lines(mm, max(start, header_end + 1), min(end, len(mm)))
+            yield from _records(
+                csv.reader(lines), header, record, columns, validate
+            )
+
+
+def _mmap_lines(mm, start, end, chunk_size=1 << 20):
+    """Yield decoded lines of mm[start:end], slicing about chunk_size at a time."""
+    while start < end:
+        stop = min(start + chunk_size, end)
+        if stop < end:
+            newline = mm.rfind(b"\n", start, stop)
+            if newline != -1:
+                stop = newline + 1
+            else:
+                newline = mm.find(b"\n", stop, end)
+                stop = end if newline == -1 else newline + 1
+        yield from mm[start:stop].decode("utf-8").splitlines(keepends=True)
+        start = stop
+
+
+def _records(reader, header, record, columns, validate):
+    """Turn csv.reader rows into the requested record type."""
+    if record not in RECORD_TYPES:
+        raise ValueError(f"record must be one of {RECORD_TYPES}")
+    fields = list(columns) if columns else header
+    missing = [name for name in fields if name not in header]
+    if missing:
+        raise ValueError(f"Unknown columns: {missing}")
+
+    width = len(header)
+    positions = [header.index(name) for name in fields]
+    pick = None if fields == header else itemgetter(*positions)
+    age_at = fields.index("age") if validate and "age" in fields else None
+    make = _record_factory(record, fields)
+
+    for row in reader:
+        if validate and len(row) != width:
+            continue
+        if pick is not None:
+            row = pick(row)
+            if len(positions) == 1:
+                row = (row,)
+        if age_at is not None:
+            try:
+                age = int(row[age_at])
+            except ValueError:
+                continue
+            row = list(row)
+            row[age_at] = age
+        yield make(row)
+
+
+def _record_factory(record, fields):
+    """Return a callable building one record from a sequence of values."""
+    if record == "tuple":
+        return tuple
+    if record == "dict":
+        return lambda values: dict(zip(fields, values))
+    if record == "namedtuple":
+        return namedtuple("UserRow", fields, rename=True)._make
+
+    slots_record = _slots_record_type(_attribute_names(fields))
+    return lambda values: slots_record(*values)
+
+
+_slots_record_types = {}
+
+
+def _attribute_names(fields):
+    """
+    Return fields as attribute names, renaming the ones that cannot be (not
+    an identifier, a keyword, a leading underscore or a duplicate) to _<index>,
+    like namedtuple(rename=True).
+    """
+    names = []
+    seen = set()
+    for index, name in enumerate(fields):
+        if (not name.isidentifier() or keyword.iskeyword(name)
+                or name.startswith("_") or name in seen):
+            name = f"_{index}"
+        seen.add(name)
+        names.append(name)
+    return tuple(names)
+
+
+def _slots_record_type(fields):
+    """Create (once per field list) a small class with __slots__ = fields."""
+    cls = _slots_record_types.get(fields)
+    if cls is None:
+        cls = type("UserRecord", (), {
+            "__slots__": fields,
+            "__repr__": lambda self: "UserRecord(" + ", ".join(
+                f"{name}={getattr(self, name)!r}" for name in fields) + ")",
+        })
 
+        def __init__(self, *values):
+            for name, value in zip(fields, values):
+                setattr(self, name, value)
 
-def stream_users():
-    """Generator that yields one user at a time from user_data.csv"""
-    with open("user_data.csv", newline='', encoding="utf-8") as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            yield row
\ No newline at end of file
+        cls.__init__ = __init__
+        _slots_record_types[fields] = cls
+    return cls
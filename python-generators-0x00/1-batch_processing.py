@@ -5,52 +5,74 @@ Batch processing users from MySQL database using generators
 
 import mysql.connector
 
+import db_pool
+from columnar import ColumnarBatch
+from prefetch import prefetch
+from pushdown import Query
+
 
 def connect_to_prodev():
-    """Connect to the ALX_prodev MySQL database"""
+    """Check out a connection to the ALX_prodev MySQL database from the pool"""
     try:
-        connection = mysql.connector.connect(
-            host="localhost",
-            user="root",
-            password="Tendency123.",  # put your MySQL password here if you set one
-            database="ALX_prodev"
-        )
-        return connection
+        return db_pool.connect()
     except mysql.connector.Error as err:
         print(f"Error: {err}")
         return None
 
 
-def stream_users_in_batches(batch_size):
+def stream_users_in_batches(batch_size, query=None, columnar=False,
+                            prefetch_depth=0):
     """
-    Generator that fetches rows in batches from user_data table
+    Generator that fetches rows in batches from user_data table.
+    An optional pushdown.Query restricts rows and columns in SQL.
+    With columnar=True, batches are columnar.ColumnarBatch objects
+    (the query must then select all four columns).
+    With prefetch_depth > 0, up to that many batches are fetched ahead
+    in a background thread.
     """
+    if prefetch_depth > 0:
+        yield from prefetch(
+            stream_users_in_batches(batch_size, query, columnar), prefetch_depth
+        )
+        return
+
     connection = connect_to_prodev()
     if not connection:
         return
 
-    cursor = connection.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM user_data;")
+    sql, params = query.to_sql() if query else ("SELECT * FROM user_data;", ())
+    cursor = connection.cursor(dictionary=not columnar)
+    try:
+        cursor.execute(sql, params)
 
-    batch = []
-    for row in cursor:
-        batch.append(row)
-        if len(batch) == batch_size:
-            yield batch
-            batch = []
+        if columnar:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield ColumnarBatch.from_rows(rows)
+            return
 
-    if batch:
-        yield batch
+        batch = []
+        for row in cursor:
+            batch.append(row)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
 
-    cursor.close()
-    connection.close()
+        if batch:
+            yield batch
+    finally:
+        cursor.close()
+        connection.close()
 
 
 def batch_processing(batch_size):
     """
-    Processes each batch to filter users over the age of 25
+    Processes each batch to filter users over the age of 25.
+    The filter runs in MySQL, so only matching rows are transferred.
     """
-    for batch in stream_users_in_batches(batch_size):
+    over_25 = Query().where("age", ">", 25)
+    for batch in stream_users_in_batches(batch_size, over_25):
         for user in batch:
-            if int(user["age"]) > 25:
-                print(user)
+            print(user)
@@ -1,20 +1,112 @@
 # 2-lazy_paginate.py
+"""
+Lazy pagination over the user_data table.
+
+Two strategies are available:
+- offset pagination (LIMIT/OFFSET), one query per page on a pooled connection;
+- keyset (seek) pagination on the user_id primary key, which reuses one
+  connection and costs the same per page at any depth.
+"""
+
+import base64
 import seed
+from prefetch import prefetch
+
 
 def paginate_users(page_size, offset):
     connection = seed.connect_to_prodev()
     cursor = connection.cursor(dictionary=True)
-    cursor.execute(f"SELECT * FROM user_data LIMIT {page_size} OFFSET {offset};")
+    cursor.execute(
+        "SELECT * FROM user_data LIMIT %s OFFSET %s;", (page_size, offset)
+    )
     rows = cursor.fetchall()
     connection.close()
     return rows
 
 
-def lazy_pagination(page_size):
+def paginate_users_keyset(connection, page_size, after_user_id=None):
+    """
+    Fetch the page of users whose user_id comes right after after_user_id.
+    Seeks on the primary key index instead of scanning skipped rows.
+    """
+    cursor = connection.cursor(dictionary=True)
+    try:
+        if after_user_id is None:
+            cursor.execute(
+                "SELECT * FROM user_data ORDER BY user_id LIMIT %s;",
+                (page_size,)
+            )
+        else:
+            cursor.execute(
+                "SELECT * FROM user_data WHERE user_id > %s "
+                "ORDER BY user_id LIMIT %s;",
+                (after_user_id, page_size)
+            )
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def encode_cursor(user_id):
+    """Encode the last seen user_id as an opaque, URL-safe cursor token."""
+    return base64.urlsafe_b64encode(user_id.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(token):
+    """Decode a cursor token produced by encode_cursor back to a user_id."""
+    if not token:
+        return None
+    return base64.urlsafe_b64decode(token.encode("ascii")).decode("utf-8")
+
+
+def next_cursor(page):
+    """Return the cursor token to resume pagination after the given page."""
+    if not page:
+        return None
+    return encode_cursor(page[-1]["user_id"])
+
+
+def lazy_pagination(page_size, keyset=False, cursor=None, prefetch_depth=0):
+    """
+    Generator that yields pages of users, fetching each page only when needed.
+
+    With keyset=True, pages are fetched by seeking on user_id over a single
+    connection. Pass cursor (from next_cursor) to resume after a given page.
+    With prefetch_depth > 0, up to that many pages are fetched ahead in a
+    background thread while the caller processes the current page.
+    """
+    if prefetch_depth > 0:
+        yield from prefetch(
+            lazy_pagination(page_size, keyset, cursor), prefetch_depth
+        )
+        return
+
+    if keyset:
+        yield from _keyset_pagination(page_size, decode_cursor(cursor))
+        return
+
     offset = 0
     while True:
         page = paginate_users(page_size, offset)
         if not page:
             break
         yield page
-        offset += page_size
\ No newline at end of file
+        offset += page_size
+
+
+def _keyset_pagination(page_size, after_user_id):
+    """Yield keyset pages over one connection until the table is exhausted."""
+    connection = seed.connect_to_prodev()
+    if not connection:
+        return
+    try:
+        while True:
+            page = paginate_users_keyset(connection, page_size, after_user_id)
+            if not page:
+                break
+            yield page
+            if len(page) < page_size:
+                break
+            after_user_id = page[-1]["user_id"]
+    finally:
+        connection.close()
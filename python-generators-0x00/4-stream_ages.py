@@ -1,32 +1,35 @@
 #!/usr/bin/python3
 import seed
+from pushdown import MySQLSource, Query
 
 def stream_user_ages():
     """Generator that yields user ages one by one from the database."""
     connection = seed.connect_to_prodev()
     cursor = connection.cursor(dictionary=True)
-    cursor.execute("SELECT age FROM user_data")
-    
-    for row in cursor:
-        yield row['age']
-    
-    cursor.close()
-    connection.close()
+    try:
+        cursor.execute("SELECT age FROM user_data")
 
-def calculate_average_age():
-    """Calculate average age using the generator."""
-    total_age = 0
-    count = 0
-    
-    for age in stream_user_ages():  # Loop 1
-        total_age += age
-        count += 1
-    
-    if count == 0:
+        for row in cursor:
+            yield row['age']
+    finally:
+        cursor.close()
+        connection.close()
+
+def calculate_average_age(source=None):
+    """
+    Calculate average age with AVG/COUNT pushed down to the source
+    (MySQL by default, or e.g. pushdown.CSVSource for the CSV file),
+    instead of streaming every age row to Python.
+    """
+    source = source or MySQLSource()
+    query = Query().aggregate("AVG", "age").aggregate("COUNT")
+    result = source.aggregate(query)[0]
+
+    if result["count"] == 0:
         print("No users found.")
         return
-    
-    average = total_age / count
+
+    average = result["avg_age"]
     print(f"Average age of users: {average:.2f}")
 
 # Run the calculation
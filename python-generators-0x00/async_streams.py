@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+async_streams.py
+Async-generator counterparts of the user_data generators, for use inside
+asyncio services:
+
+    stream_users()                  -> 0-stream_users.stream_users
+    stream_users_in_batches(size)   -> 1-batch_processing.stream_users_in_batches
+    lazy_pagination(page_size)      -> 2-lazy_paginate.lazy_pagination (keyset)
+    stream_user_ages()              -> 4-stream_ages.stream_user_ages
+
+They run on aiomysql (pip install aiomysql) with the credentials from
+db_pool.py, and keep the next batch/page fetch in flight while the consumer
+processes the current one, so network I/O overlaps with processing.
+
+Usage:
+    async for batch in stream_users_in_batches(100):
+        ...
+"""
+
+import asyncio
+
+try:
+    import aiomysql
+except ImportError:  # aiomysql is only needed for the async generators
+    aiomysql = None
+
+import db_pool
+
+
+async def connect_to_prodev():
+    """Open an aiomysql connection to the ALX_prodev database."""
+    if aiomysql is None:
+        raise RuntimeError("aiomysql is not installed: pip install aiomysql")
+    return await aiomysql.connect(
+        host=db_pool.DB_HOST,
+        port=db_pool.DB_PORT,
+        user=db_pool.DB_USER,
+        password=db_pool.DB_PASSWORD,
+        db=db_pool.DB_NAME,
+        autocommit=True,
+    )
+
+
+async def prefetch(fetch):
+    """
+    Async generator yielding the results of repeated `await fetch()` until
+    one is empty, with the next fetch already running while the caller
+    processes the current result.
+    """
+    pending = asyncio.ensure_future(fetch())
+    try:
+        while True:
+            result = await pending
+            if not result:
+                break
+            pending = asyncio.ensure_future(fetch())
+            yield result
+    finally:
+        if not pending.done():
+            pending.cancel()
+            try:
+                await pending
+            except asyncio.CancelledError:
+                pass
+
+
+async def stream_users_in_batches(batch_size, sql="SELECT * FROM user_data;",
+                                  params=None):
+    """Async generator that yields lists of user dicts, batch_size at a time."""
+    connection = await connect_to_prodev()
+    try:
+        cursor = await connection.cursor(aiomysql.SSDictCursor)
+        await cursor.execute(sql, params)
+        async for batch in prefetch(lambda: cursor.fetchmany(batch_size)):
+            yield batch
+    finally:
+        # close() drops the socket at once, which is what we want when a
+        # consumer stops early with rows still unread on the server.
+        connection.close()
+
+
+async def stream_users(batch_size=100):
+    """Async generator that yields user dicts one by one."""
+    async for batch in stream_users_in_batches(batch_size):
+        for row in batch:
+            yield row
+
+
+async def lazy_pagination(page_size, after_user_id=None):
+    """
+    Async generator that yields pages of users by seeking on user_id over a
+    single connection; the next page is requested as soon as the current
+    page's last key is known. Resume with after_user_id.
+    """
+    connection = await connect_to_prodev()
+    last_seen = after_user_id
+
+    async def fetch_page():
+        nonlocal last_seen
+        async with connection.cursor(aiomysql.DictCursor) as cursor:
+            if last_seen is None:
+                await cursor.execute(
+                    "SELECT * FROM user_data ORDER BY user_id LIMIT %s;",
+                    (page_size,)
+                )
+            else:
+                await cursor.execute(
+                    "SELECT * FROM user_data WHERE user_id > %s "
+                    "ORDER BY user_id LIMIT %s;",
+                    (last_seen, page_size)
+                )
+            page = await cursor.fetchall()
+        if page:
+            last_seen = page[-1]["user_id"]
+        return page
+
+    try:
+        async for page in prefetch(fetch_page):
+            yield page
+            if len(page) < page_size:
+                break
+    finally:
+        connection.close()
+
+
+async def stream_user_ages(batch_size=1000):
+    """Async generator that yields user ages one by one."""
+    async for batch in stream_users_in_batches(
+            batch_size, "SELECT age FROM user_data;"):
+        for row in batch:
+            yield row["age"]
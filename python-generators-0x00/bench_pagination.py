@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+"""
+Benchmark offset (LIMIT/OFFSET) vs keyset pagination at increasing depths.
+
+Usage:
+    ./bench_pagination.py [page_size] [pages_per_run]
+"""
+
+import sys
+import time
+
+seed = __import__('seed')
+lazy = __import__('2-lazy_paginate')
+
+
+def user_id_at(connection, offset):
+    """Return the user_id at the given position in primary key order."""
+    cursor = connection.cursor()
+    cursor.execute(
+        "SELECT user_id FROM user_data ORDER BY user_id LIMIT 1 OFFSET %s;",
+        (offset,)
+    )
+    row = cursor.fetchone()
+    cursor.close()
+    return row[0] if row else None
+
+
+def bench_offset(page_size, start, pages):
+    """Fetch pages starting at row start with LIMIT/OFFSET; return pages/sec."""
+    began = time.perf_counter()
+    for i in range(pages):
+        lazy.paginate_users(page_size, start + i * page_size)
+    return pages / (time.perf_counter() - began)
+
+
+def bench_keyset(connection, page_size, start, pages):
+    """Fetch pages starting at row start by seeking; return pages/sec."""
+    # Resolving the starting key is a one-off cost for a resumed cursor,
+    # so it is kept out of the timed section.
+    after = user_id_at(connection, start - 1) if start else None
+    began = time.perf_counter()
+    for _ in range(pages):
+        page = lazy.paginate_users_keyset(connection, page_size, after)
+        if not page:
+            break
+        after = page[-1]["user_id"]
+    return pages / (time.perf_counter() - began)
+
+
+def main():
+    page_size = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    pages = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    connection = seed.connect_to_prodev()
+    if not connection:
+        raise SystemExit("Cannot connect to ALX_prodev database.")
+    cursor = connection.cursor()
+    cursor.execute("SELECT COUNT(*) FROM user_data;")
+    total = cursor.fetchone()[0]
+    cursor.close()
+
+    print(f"user_data rows: {total}, page_size: {page_size}")
+    print(f"{'depth':>12} {'offset p/s':>12} {'keyset p/s':>12}")
+    depth = 0
+    while depth + pages * page_size <= total:
+        offset_rate = bench_offset(page_size, depth, pages)
+        keyset_rate = bench_keyset(connection, page_size, depth, pages)
+        print(f"{depth:>12} {offset_rate:>12.1f} {keyset_rate:>12.1f}")
+        depth = depth * 10 if depth else 1000
+
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()
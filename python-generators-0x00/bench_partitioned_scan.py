@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+"""
+Benchmark partitioned_scan scaling from 1 to N worker processes.
+
+Each batch goes through a CPU-bound validation/enrichment step
+(email check, name hashing, age filter) so the scan is compute-bound.
+
+Usage:
+    ./bench_partitioned_scan.py [max_workers]
+"""
+
+import hashlib
+import os
+import re
+import sys
+import time
+
+from partitioned_scan import partitioned_scan
+
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[a-zA-Z]{2,}$")
+
+
+def enrich_over_25(batch):
+    """Validate and enrich rows of users older than 25."""
+    results = []
+    for user_id, name, email, age in batch:
+        if age <= 25 or not EMAIL_RE.match(email):
+            continue
+        digest = name.encode("utf-8")
+        for _ in range(200):
+            digest = hashlib.sha256(digest).digest()
+        results.append((user_id, digest.hex()[:16], age))
+    return results
+
+
+def main():
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+
+    baseline = None
+    print(f"{'workers':>8} {'rows':>10} {'seconds':>9} {'rows/s':>10} {'speedup':>8}")
+    workers = 1
+    while workers <= max_workers:
+        started = time.perf_counter()
+        rows = sum(1 for _ in partitioned_scan(enrich_over_25, workers=workers))
+        elapsed = time.perf_counter() - started
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {rows:>10} {elapsed:>9.2f} "
+              f"{rows / elapsed:>10.0f} {baseline / elapsed:>7.2f}x")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
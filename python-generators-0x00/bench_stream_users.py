@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+"""
+Benchmark 0-stream_users record modes (rows/sec) against csv.DictReader.
+
+Generates a synthetic CSV with the user_data.csv layout, then streams it
+with every record type and with parallel mmap byte-range readers.
+
+Usage:
+    ./bench_stream_users.py [rows] [readers]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+stream_module = __import__('0-stream_users')
+
+
+def write_sample_csv(path, rows):
+    """Write `rows` random users in the name,email,age layout."""
+    with open(path, "w", encoding="utf-8", newline='') as f:
+        f.write("name,email,age\n")
+        for i in range(rows):
+            f.write(f"User {i},user{i}@example.com,{random.randint(18, 90)}\n")
+
+
+def count_range(args):
+    """Count the rows of one byte range (runs in a worker process)."""
+    path, start, end = args
+    return sum(1 for _ in stream_module.stream_users_range(path, start, end))
+
+
+def parallel_rows(path, readers):
+    """Count rows with one mmap byte-range reader per process."""
+    ranges = stream_module.split_byte_ranges(path, readers)
+    with ProcessPoolExecutor(max_workers=readers) as executor:
+        for count in executor.map(
+                count_range, [(path, start, end) for start, end in ranges]):
+            yield from range(count)
+
+
+def timed(label, rows_iter, baseline=None):
+    """Drain rows_iter and print its rows/sec; return elapsed seconds."""
+    started = time.perf_counter()
+    rows = sum(1 for _ in rows_iter)
+    elapsed = time.perf_counter() - started
+    speedup = f"{baseline / elapsed:.2f}x" if baseline else "1.00x"
+    print(f"{label:<28} {rows / elapsed:>12.0f} {speedup:>8}")
+    return elapsed
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    try:
+        write_sample_csv(path, rows)
+        print(f"{rows} rows, {os.path.getsize(path)} bytes")
+        print(f"{'mode':<28} {'rows/s':>12} {'speedup':>8}")
+
+        baseline = timed("DictReader (default)", stream_module.stream_users(path))
+        for record in ("tuple", "namedtuple", "slots"):
+            timed(record, stream_module.stream_users(path, record=record), baseline)
+        timed("tuple, columns=[age]",
+              stream_module.stream_users(path, record="tuple", columns=["age"]),
+              baseline)
+        timed("tuple, validate",
+              stream_module.stream_users(path, record="tuple", validate=True),
+              baseline)
+
+        timed(f"mmap ranges x{readers}",
+              parallel_rows(path, readers), baseline)
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
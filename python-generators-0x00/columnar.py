@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+columnar.py
+Compact, array-backed batches of user_data rows.
+
+A ColumnarBatch stores each column contiguously instead of one dict/tuple
+per row:
+- user_id as 16-byte binary UUIDs in a single bytearray;
+- name and email as concatenated UTF-8 bytes plus an offsets array;
+- age as array('i').
+
+Filters and aggregates on age work on the whole column at once, using
+NumPy when it is installed and plain loops over the arrays otherwise.
+"""
+
+import operator
+import uuid
+from array import array
+from itertools import accumulate
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+_OPERATORS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+
+class StringColumn:
+    """Strings stored as one UTF-8 buffer plus end offsets."""
+
+    __slots__ = ("data", "offsets")
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array("Q", [0])
+
+    def append(self, value):
+        self.data += value.encode("utf-8")
+        self.offsets.append(len(self.data))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.data[start:end].decode("utf-8")
+
+    def take(self, indices):
+        """Return a new column holding only the strings at indices."""
+        column = StringColumn()
+        if np is not None:
+            offsets = np.frombuffer(self.offsets, dtype=np.uint64).astype(np.int64)
+            indices = np.asarray(indices, dtype=np.int64)
+            starts = offsets[indices]
+            lengths = offsets[indices + 1] - starts
+            ends = np.cumsum(lengths)
+            # Byte positions to gather: each selected string's start, shifted
+            # by the position of that byte inside the new buffer.
+            positions = (np.repeat(starts - (ends - lengths), lengths)
+                         + np.arange(int(ends[-1]) if len(ends) else 0))
+            data = np.frombuffer(self.data, dtype=np.uint8)
+            column.data = bytearray(data[positions].tobytes())
+            column.offsets.frombytes(ends.astype(np.uint64).tobytes())
+            return column
+
+        data, offsets = self.data, self.offsets
+        pieces = [data[offsets[i]:offsets[i + 1]] for i in indices]
+        column.data = bytearray(b"".join(pieces))
+        column.offsets.extend(accumulate(len(piece) for piece in pieces))
+        return column
+
+    @property
+    def nbytes(self):
+        return len(self.data) + self.offsets.itemsize * len(self.offsets)
+
+
+class ColumnarBatch:
+    """A batch of user_data rows stored column by column."""
+
+    __slots__ = ("user_ids", "names", "emails", "ages")
+
+    def __init__(self):
+        self.user_ids = bytearray()
+        self.names = StringColumn()
+        self.emails = StringColumn()
+        self.ages = array("i")
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Build a batch from (user_id, name, email, age) tuples or from
+        dicts with those keys.
+        """
+        batch = cls()
+        for row in rows:
+            if isinstance(row, dict):
+                row = (row["user_id"], row["name"], row["email"], row["age"])
+            user_id, name, email, age = row
+            batch.user_ids += uuid.UUID(user_id).bytes
+            batch.names.append(name)
+            batch.emails.append(email)
+            batch.ages.append(int(age))
+        return batch
+
+    def __len__(self):
+        return len(self.ages)
+
+    def user_id(self, index):
+        """Return the user_id at index as a canonical UUID string."""
+        start = index * 16
+        return str(uuid.UUID(bytes=bytes(self.user_ids[start:start + 16])))
+
+    def row(self, index):
+        """Materialize one row as a (user_id, name, email, age) tuple."""
+        return (self.user_id(index), self.names[index],
+                self.emails[index], self.ages[index])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.row(index)
+
+    def take(self, indices):
+        """Return a new batch holding only the rows at indices."""
+        batch = ColumnarBatch()
+        batch.names = self.names.take(indices)
+        batch.emails = self.emails.take(indices)
+        if np is not None:
+            batch.user_ids = bytearray(
+                np.frombuffer(self.user_ids, dtype="V16")[indices].tobytes()
+            )
+            batch.ages.frombytes(self.ages_array()[indices].tobytes())
+            return batch
+
+        user_ids = self.user_ids
+        batch.user_ids = bytearray(
+            b"".join([user_ids[i * 16:(i + 1) * 16] for i in indices])
+        )
+        batch.ages = array("i", (self.ages[i] for i in indices))
+        return batch
+
+    def ages_array(self):
+        """Zero-copy NumPy view of the age column (requires NumPy)."""
+        if np is None:
+            raise RuntimeError("NumPy is not installed")
+        return np.frombuffer(self.ages, dtype=np.int32)
+
+    @property
+    def nbytes(self):
+        return (len(self.user_ids) + self.names.nbytes + self.emails.nbytes
+                + self.ages.itemsize * len(self.ages))
+
+
+# ------------------ Vectorized helpers ------------------
+
+def age_indices(batch, op, value):
+    """
+    Return the indices of rows whose age satisfies `age <op> value`
+    (a NumPy array when NumPy is installed, a list otherwise).
+    """
+    compare = _OPERATORS[op]
+    if np is not None:
+        return np.flatnonzero(compare(batch.ages_array(), value))
+    return [i for i, age in enumerate(batch.ages) if compare(age, value)]
+
+
+def filter_by_age(batch, op, value):
+    """Return a new batch with the rows whose age satisfies `age <op> value`."""
+    return batch.take(age_indices(batch, op, value))
+
+
+def age_stats(batches):
+    """
+    Compute count/sum/min/max/avg of age over an iterable of batches,
+    one column-wide reduction per batch.
+    """
+    count, total, minimum, maximum = 0, 0, None, None
+    for batch in batches:
+        if not len(batch):
+            continue
+        if np is not None:
+            ages = batch.ages_array()
+            batch_total = int(ages.sum(dtype=np.int64))
+            batch_min, batch_max = int(ages.min()), int(ages.max())
+        else:
+            batch_total = sum(batch.ages)
+            batch_min, batch_max = min(batch.ages), max(batch.ages)
+        count += len(batch)
+        total += batch_total
+        minimum = batch_min if minimum is None else min(minimum, batch_min)
+        maximum = batch_max if maximum is None else max(maximum, batch_max)
+    return {
+        "count": count,
+        "sum": total,
+        "min": minimum,
+        "max": maximum,
+        "avg": total / count if count else None,
+    }
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+db_pool.py
+Pooled connections to the ALX_prodev MySQL database, shared by the seed,
+batch, pagination and streaming generators so they stop paying connection
+setup (TCP + auth handshake) on every call.
+
+Credentials and pool limits come from the environment:
+    ALX_DB_HOST, ALX_DB_PORT, ALX_DB_USER, ALX_DB_PASSWORD, ALX_DB_NAME,
+    ALX_DB_POOL_SIZE, ALX_DB_POOL_MAX_OVERFLOW, ALX_DB_POOL_IDLE_TIMEOUT,
+    ALX_DB_POOL_TIMEOUT
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+import mysql.connector
+from mysql.connector.errors import PoolError
+
+# ======== CONFIG: override through the environment ========
+DB_HOST = os.environ.get("ALX_DB_HOST", "localhost")
+DB_PORT = int(os.environ.get("ALX_DB_PORT", "3306"))
+DB_USER = os.environ.get("ALX_DB_USER", "root")
+DB_PASSWORD = os.environ.get("ALX_DB_PASSWORD", "Tendency123.")
+DB_NAME = os.environ.get("ALX_DB_NAME", "ALX_prodev")
+
+POOL_SIZE = int(os.environ.get("ALX_DB_POOL_SIZE", "5"))
+POOL_MAX_OVERFLOW = int(os.environ.get("ALX_DB_POOL_MAX_OVERFLOW", "5"))
+POOL_IDLE_TIMEOUT = float(os.environ.get("ALX_DB_POOL_IDLE_TIMEOUT", "300"))
+POOL_TIMEOUT = float(os.environ.get("ALX_DB_POOL_TIMEOUT", "30"))
+# ==========================================================
+
+
+class PooledConnection:
+    """
+    Proxy around a pooled mysql.connector connection.
+    Behaves like the raw connection, except close() hands it back to the pool.
+    """
+
+    def __init__(self, pool, connection):
+        self._pool = pool
+        self._connection = connection
+
+    def __getattr__(self, name):
+        if self._connection is None:
+            raise PoolError("Connection was already returned to the pool")
+        return getattr(self._connection, name)
+
+    def close(self):
+        """Return the connection to the pool instead of closing it."""
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            self._pool.release(connection)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of MySQL connections.
+
+    - size: connections kept open while idle.
+    - max_overflow: extra connections opened under load, closed on release.
+    - idle_timeout: idle connections older than this (seconds) are closed.
+    - timeout: seconds acquire() waits for a free connection before PoolError.
+    - health_check: ping connections on checkout and replace dead ones.
+    """
+
+    def __init__(self, size=POOL_SIZE, max_overflow=POOL_MAX_OVERFLOW,
+                 idle_timeout=POOL_IDLE_TIMEOUT, timeout=POOL_TIMEOUT,
+                 health_check=True, **connect_kwargs):
+        self.size = size
+        self.max_overflow = max_overflow
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.health_check = health_check
+        self.connect_kwargs = connect_kwargs or {
+            "host": DB_HOST,
+            "port": DB_PORT,
+            "user": DB_USER,
+            "password": DB_PASSWORD,
+            "database": DB_NAME,
+            "autocommit": False,
+            # drain unread rows when a cursor is closed early, so a generator
+            # abandoned mid-stream still returns a usable connection
+            "consume_results": True,
+        }
+
+        self._idle = deque()  # (connection, released_at), most recent last
+        self._open = 0
+        self._cond = threading.Condition()
+
+        self._checkouts = 0
+        self._created = 0
+        self._discarded = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._max_wait_time = 0.0
+
+    def acquire(self, timeout=None):
+        """Check out a connection, wrapped so that close() releases it."""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.perf_counter()
+        deadline = started + timeout
+        while True:
+            connection, create = self._reserve(deadline)
+            if create:
+                try:
+                    connection = mysql.connector.connect(**self.connect_kwargs)
+                except mysql.connector.Error:
+                    self._forget()
+                    raise
+                with self._cond:
+                    self._created += 1
+            elif self.health_check and not self._is_healthy(connection):
+                self._discard(connection)
+                continue
+            break
+
+        waited = time.perf_counter() - started
+        with self._cond:
+            self._checkouts += 1
+            self._wait_time += waited
+            self._max_wait_time = max(self._max_wait_time, waited)
+        return PooledConnection(self, connection)
+
+    def connection(self, timeout=None):
+        """Context manager form: `with pool.connection() as conn: ...`."""
+        return self.acquire(timeout)
+
+    def release(self, connection):
+        """Return a raw connection; it is reset, kept idle or closed."""
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+        except mysql.connector.Error:
+            self._discard(connection)
+            return
+
+        with self._cond:
+            if len(self._idle) < self.size:
+                self._idle.append((connection, time.monotonic()))
+                self._cond.notify()
+                return
+        self._discard(connection)
+
+    def close(self):
+        """Close every idle connection; checked-out ones close on release."""
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._open -= len(idle)
+            self._discarded += len(idle)
+            self.size = 0
+        for connection, _ in idle:
+            _close_quietly(connection)
+
+    def stats(self):
+        """Return a snapshot of pool usage counters."""
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "open": self._open,
+                "idle": idle,
+                "in_use": self._open - idle,
+                "checkouts": self._checkouts,
+                "created": self._created,
+                "discarded": self._discarded,
+                "waits": self._waits,
+                "total_wait_time": self._wait_time,
+                "max_wait_time": self._max_wait_time,
+                "avg_wait_time": (
+                    self._wait_time / self._checkouts if self._checkouts else 0.0
+                ),
+            }
+
+    def _reserve(self, deadline):
+        """
+        Under the lock, pick an idle connection or claim a slot for a new one.
+        Returns (connection, False) or (None, True); waits while the pool is full.
+        """
+        stale = []
+        try:
+            with self._cond:
+                waited = False
+                while True:
+                    now = time.monotonic()
+                    while self._idle:
+                        connection, released_at = self._idle.pop()
+                        if self.idle_timeout and now - released_at > self.idle_timeout:
+                            stale.append(connection)
+                            self._open -= 1
+                            self._discarded += 1
+                            continue
+                        return connection, False
+                    if self._open < self.size + self.max_overflow:
+                        self._open += 1
+                        return None, True
+
+                    if not waited:
+                        waited = True
+                        self._waits += 1
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        raise PoolError(
+                            f"Timed out waiting for a connection "
+                            f"({self._open} open, none free)"
+                        )
+                    self._cond.wait(remaining)
+        finally:
+            for connection in stale:
+                _close_quietly(connection)
+
+    def _is_healthy(self, connection):
+        try:
+            return connection.is_connected()
+        except mysql.connector.Error:
+            return False
+
+    def _forget(self):
+        """Give back a slot reserved for a connection that was never opened."""
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+    def _discard(self, connection):
+        """Close a connection and free its slot."""
+        _close_quietly(connection)
+        with self._cond:
+            self._open -= 1
+            self._discarded += 1
+            self._cond.notify()
+
+
+def _close_quietly(connection):
+    try:
+        connection.close()
+    except mysql.connector.Error:
+        pass
+
+
+# ------------------ Process-wide shared pool ------------------
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+# Pools inherited through fork. They are kept referenced (never closed or
+# collected) because shutting down their sockets would also cut the
+# parent's connections.
+_inherited_pools = []
+
+
+def get_pool():
+    """
+    Return the process-wide pool, creating it on first use.
+    A fresh pool is created after fork so children never share sockets.
+    """
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            if _pool is not None:
+                _inherited_pools.append(_pool)
+            _pool = ConnectionPool()
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def configure_pool(**kwargs):
+    """Replace the shared pool with one built from the given options."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        old = _pool if _pool_pid == os.getpid() else None
+        _pool = ConnectionPool(**kwargs)
+        _pool_pid = os.getpid()
+    if old is not None:
+        old.close()
+    return _pool
+
+
+def connect():
+    """Check out a connection to ALX_prodev from the shared pool."""
+    return get_pool().acquire()
+
+
+def pool_stats():
+    """Return usage counters of the shared pool."""
+    return get_pool().stats()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+partitioned_scan.py
+Parallel scan of user_data across worker processes.
+
+The table is split into user_id (primary key) ranges of roughly equal size;
+each range is scanned by a worker process on its own pooled connection with
+seed.stream_user_data_in_batches, and a per-batch function runs there, so
+CPU-bound row work is no longer capped at one core.
+
+Usage:
+    def over_25(batch):
+        return [row for row in batch if row[3] > 25]
+
+    for row in partitioned_scan(over_25, workers=4):
+        ...
+
+The batch function must be defined at module level so it can be pickled.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import seed
+
+
+def partition_bounds(connection, partitions):
+    """
+    Split user_data into at most `partitions` user_id ranges of similar size.
+    Returns a list of (lower, upper) pairs, lower inclusive and upper
+    exclusive, with None for an open end.
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT COUNT(*) FROM user_data;")
+        total = cursor.fetchone()[0]
+        partitions = max(1, min(partitions, total))
+        step = -(-total // partitions) or 1
+
+        # Each probe seeks to the previous boundary on the primary key and
+        # skips `step` index entries from there, so all the probes together
+        # read the index once instead of re-skipping from the start.
+        boundaries = []
+        for _ in range(step, total, step):
+            if boundaries:
+                cursor.execute(
+                    "SELECT user_id FROM user_data WHERE user_id >= %s "
+                    "ORDER BY user_id LIMIT 1 OFFSET %s;",
+                    (boundaries[-1], step)
+                )
+            else:
+                cursor.execute(
+                    "SELECT user_id FROM user_data ORDER BY user_id "
+                    "LIMIT 1 OFFSET %s;",
+                    (step,)
+                )
+            row = cursor.fetchone()
+            if row is None:  # rows deleted since the count
+                break
+            boundaries.append(row[0])
+    finally:
+        cursor.close()
+
+    lowers = [None] + boundaries
+    uppers = boundaries + [None]
+    return list(zip(lowers, uppers))
+
+
+def scan_partition(bounds, func, batch_size=1000):
+    """
+    Worker entry point: scan one user_id range and return the concatenated
+    results of func(batch) over its batches.
+    """
+    lower, upper = bounds
+    connection = seed.connect_to_prodev()
+    if not connection:
+        raise RuntimeError("Cannot connect to ALX_prodev database.")
+    try:
+        results = []
+        for batch in seed.stream_user_data_in_batches(
+                connection, batch_size, lower, upper):
+            results.extend(func(batch))
+        return results
+    finally:
+        connection.close()
+
+
+def partitioned_scan(func, partitions=None, workers=None, ordered=True,
+                     batch_size=1000):
+    """
+    Generator that applies func to every batch of user_data rows in
+    parallel and yields the items func returns.
+
+    - workers: worker processes (default: CPU count).
+    - partitions: number of user_id ranges (default: 4 per worker, so a slow
+      range does not leave the other workers idle).
+    - ordered: yield results in user_id order; otherwise yield each
+      partition's results as soon as it completes.
+    """
+    workers = workers or os.cpu_count() or 1
+    partitions = partitions or workers * 4
+
+    connection = seed.connect_to_prodev()
+    if not connection:
+        return
+    try:
+        bounds = partition_bounds(connection, partitions)
+    finally:
+        connection.close()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(scan_partition, b, func, batch_size)
+            for b in bounds
+        ]
+        if ordered:
+            for future in futures:
+                yield from future.result()
+        else:
+            for future in as_completed(futures):
+                yield from future.result()
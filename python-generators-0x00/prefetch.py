@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+prefetch.py
+Read-ahead stage for the batch and page generators.
+
+prefetch(generator, depth) runs the generator in a background thread and
+keeps up to `depth` batches/pages queued, so the next fetchmany or page
+query is already running while the consumer works on the current one.
+
+- Backpressure: the producer blocks once `depth` items are waiting.
+- Errors raised by the generator are re-raised in the consumer.
+- Closing the consumer (break, close(), garbage collection) stops the
+  producer and closes the underlying generator in its own thread, which
+  releases its cursor and connection.
+
+Usage:
+    for page in prefetch(lazy_pagination(100), depth=2):
+        process(page)
+"""
+
+import queue
+import threading
+
+_DONE = object()
+_POLL_INTERVAL = 0.1
+
+
+class _Failure:
+    """Wraps an exception raised by the producer."""
+
+    __slots__ = ("error",)
+
+    def __init__(self, error):
+        self.error = error
+
+
+def prefetch(iterable, depth=2):
+    """Generator that yields the items of iterable, produced ahead in a thread."""
+    if depth < 1:
+        yield from iterable
+        return
+
+    items = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item):
+        # Poll so that a producer stuck on a full queue notices cancellation.
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        iterator = iter(iterable)
+        try:
+            for item in iterator:
+                if not put(item):
+                    return
+            put(_DONE)
+        except BaseException as error:
+            put(_Failure(error))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    thread = threading.Thread(target=produce, name="prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = items.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        thread.join()
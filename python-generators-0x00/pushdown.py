@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+pushdown.py
+A small query layer for the user_data generators.
+
+Predicates (WHERE), projections (selected columns) and aggregates
+(AVG/COUNT/SUM/MIN/MAX, optionally grouped into fixed-width buckets) are
+described once with Query and then:
+- compiled into parameterized SQL by MySQLSource, so only the matching
+  rows or the aggregate results travel over the wire;
+- evaluated in a single streaming pass by CSVSource for user_data.csv.
+
+Usage:
+    query = Query().where("age", ">", 25).select("name", "age")
+    for batch in MySQLSource().batches(query, 100):
+        ...
+    MySQLSource().aggregate(Query().aggregate("AVG", "age"))
+"""
+
+import csv
+import operator
+from decimal import Decimal
+
+import db_pool
+
+COLUMNS = ("user_id", "name", "email", "age")
+NUMERIC_COLUMNS = ("age",)
+
+_OPERATORS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+_AGGREGATES = ("AVG", "COUNT", "SUM", "MIN", "MAX")
+
+
+def _check_column(column):
+    """Only known columns may reach the SQL text (they cannot be parameters)."""
+    if column not in COLUMNS:
+        raise ValueError(f"Unknown user_data column: {column!r}")
+    return column
+
+
+class Query:
+    """Description of a user_data query, built up with chained calls."""
+
+    def __init__(self):
+        self.columns = list(COLUMNS)
+        self.predicates = []  # (column, operator, value)
+        self.aggregates = []  # (function, column or "*")
+        self.bucket = None  # (column, width)
+
+    def select(self, *columns):
+        """Project the result onto the given columns."""
+        self.columns = [_check_column(column) for column in columns]
+        return self
+
+    def where(self, column, op, value):
+        """Add a predicate; all predicates are combined with AND."""
+        if op not in _OPERATORS:
+            raise ValueError(f"Unsupported operator: {op!r}")
+        self.predicates.append((_check_column(column), op, value))
+        return self
+
+    def aggregate(self, function, column="*"):
+        """Add an aggregate such as ("AVG", "age") or ("COUNT", "*")."""
+        function = function.upper()
+        if function not in _AGGREGATES:
+            raise ValueError(f"Unsupported aggregate: {function!r}")
+        if column != "*":
+            _check_column(column)
+        elif function != "COUNT":
+            raise ValueError(f"{function} needs a column")
+        self.aggregates.append((function, column))
+        return self
+
+    def group_by_bucket(self, column, width):
+        """Group aggregates into [n * width, (n + 1) * width) buckets of column."""
+        if _check_column(column) not in NUMERIC_COLUMNS:
+            raise ValueError(f"Cannot bucket non-numeric column: {column!r}")
+        self.bucket = (column, int(width))
+        return self
+
+    def to_sql(self):
+        """Compile into (sql, params) for mysql.connector."""
+        params = []
+        if self.aggregates:
+            select = [
+                f"{function}({column}) AS {_alias(function, column)}"
+                for function, column in self.aggregates
+            ]
+            if self.bucket:
+                column, width = self.bucket
+                select.insert(0, f"FLOOR({column} / %s) * %s AS bucket")
+                params.extend([width, width])
+        else:
+            select = list(self.columns)
+
+        sql = f"SELECT {', '.join(select)} FROM user_data"
+        if self.predicates:
+            sql += " WHERE " + " AND ".join(
+                f"{column} {op} %s" for column, op, _ in self.predicates
+            )
+            params.extend(value for _, _, value in self.predicates)
+        if self.aggregates and self.bucket:
+            sql += " GROUP BY bucket ORDER BY bucket"
+        return sql + ";", tuple(params)
+
+    def matches(self, row):
+        """Evaluate the predicates against a row dict."""
+        return all(
+            _OPERATORS[op](row[column], value)
+            for column, op, value in self.predicates
+        )
+
+    def project(self, row):
+        """Keep only the selected columns of a row dict."""
+        return {column: row.get(column) for column in self.columns}
+
+
+def _alias(function, column):
+    return "count" if column == "*" else f"{function.lower()}_{column}"
+
+
+class MySQLSource:
+    """Runs queries on the ALX_prodev database, pushing work into MySQL."""
+
+    def __init__(self, connect=db_pool.connect):
+        self.connect = connect
+
+    def batches(self, query, batch_size=1000):
+        """Generator that yields lists of matching row dicts."""
+        sql, params = query.to_sql()
+        connection = self.connect()
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute(sql, params)
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                yield batch
+        finally:
+            cursor.close()
+            connection.close()
+
+    def rows(self, query):
+        """Generator that yields matching row dicts one by one."""
+        for batch in self.batches(query):
+            yield from batch
+
+    def aggregate(self, query):
+        """
+        Run an aggregate query and return a list of result dicts:
+        one per bucket when grouped, otherwise a single dict.
+        """
+        if not query.aggregates:
+            raise ValueError("Query has no aggregates")
+        results = []
+        for batch in self.batches(query):
+            for row in batch:
+                result = {
+                    key: float(value) if isinstance(value, Decimal) else value
+                    for key, value in row.items()
+                }
+                if "bucket" in result:
+                    result["bucket"] = int(result["bucket"])
+                results.append(result)
+        return results
+
+
+class CSVSource:
+    """Evaluates queries over user_data.csv in a single streaming pass."""
+
+    def __init__(self, csv_path="user_data.csv"):
+        self.csv_path = csv_path
+
+    def _read(self, query):
+        with open(self.csv_path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                for column in NUMERIC_COLUMNS:
+                    if column in row:
+                        row[column] = int(float(row[column]))
+                if query.matches(row):
+                    yield row
+
+    def batches(self, query, batch_size=1000):
+        """Generator that yields lists of matching row dicts."""
+        batch = []
+        for row in self.rows(query):
+            batch.append(row)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def rows(self, query):
+        """Generator that yields matching row dicts one by one."""
+        for row in self._read(query):
+            yield query.project(row)
+
+    def aggregate(self, query):
+        """Same results as MySQLSource.aggregate, computed in constant memory."""
+        if not query.aggregates:
+            raise ValueError("Query has no aggregates")
+        groups = {}
+        for row in self._read(query):
+            key = None
+            if query.bucket:
+                column, width = query.bucket
+                key = row[column] // width * width
+            states = groups.get(key)
+            if states is None:
+                states = groups[key] = [_Accumulator() for _ in query.aggregates]
+            for state, (_, column) in zip(states, query.aggregates):
+                state.add(1 if column == "*" else row[column])
+
+        if not groups and not query.bucket:
+            groups[None] = [_Accumulator() for _ in query.aggregates]
+        results = []
+        for key in sorted(groups, key=lambda k: (k is None, k)):
+            result = {} if key is None else {"bucket": key}
+            for state, (function, column) in zip(groups[key], query.aggregates):
+                result[_alias(function, column)] = state.result(function)
+            results.append(result)
+        return results
+
+
+class _Accumulator:
+    """Running COUNT/SUM/MIN/MAX state for one aggregated column."""
+
+    __slots__ = ("count", "total", "minimum", "maximum")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = None
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def result(self, function):
+        if function == "COUNT":
+            return self.count
+        if not self.count:
+            return None
+        if function == "AVG":
+            return self.total / self.count
+        if function == "SUM":
+            return self.total
+        return self.minimum if function == "MIN" else self.maximum
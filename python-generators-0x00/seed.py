@@ -6,17 +6,23 @@ and stream rows using Python generators for memory-efficient processing.
 """
 
 import csv
+import os
+import tempfile
+import time
 import uuid
 import mysql.connector
 from mysql.connector import errorcode
 
-# ======== CONFIG: adapt these to your local environment ========
-DB_HOST = "localhost"
-DB_PORT = 3306
-DB_USER = "root"
-DB_PASSWORD = "Tendency123."
-DB_NAME = "ALX_prodev"
-# =============================================================
+import db_pool
+from columnar import ColumnarBatch
+
+# ======== CONFIG: set through ALX_DB_* env vars, see db_pool.py ========
+DB_HOST = db_pool.DB_HOST
+DB_PORT = db_pool.DB_PORT
+DB_USER = db_pool.DB_USER
+DB_PASSWORD = db_pool.DB_PASSWORD
+DB_NAME = db_pool.DB_NAME
+# =======================================================================
 
 def connect_db():
     """
@@ -52,18 +58,12 @@ def create_database(connection):
 
 def connect_to_prodev():
     """
-    Connect to the ALX_prodev database and return the connection.
+    Check out a connection to the ALX_prodev database from the shared pool.
+    Autocommit is off (we commit manually after inserts); close() returns
+    the connection to the pool.
     """
     try:
-        conn = mysql.connector.connect(
-            host=DB_HOST,
-            port=DB_PORT,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            database=DB_NAME,
-            autocommit=False  # we'll commit manually after inserts
-        )
-        return conn
+        return db_pool.connect()
     except mysql.connector.Error as err:
         print(f"[connect_to_prodev] Error: {err}")
         return None
@@ -92,6 +92,35 @@ def create_table(connection):
     finally:
         cursor.close()
 
+def _normalize_row(row):
+    """
+    Turn a CSV row dict into a (user_id, name, email, age) tuple.
+    Expected headers: user_id (optional), name, email, age (any case).
+    Returns None (after reporting why) for rows that cannot be inserted.
+    """
+    user_id = row.get('user_id') or row.get('id') or None
+    name = row.get('name') or row.get('Name') or None
+    email = row.get('email') or row.get('Email') or None
+    age = row.get('age') or row.get('Age') or None
+
+    if not (name and email and age):
+        # skip invalid row, but you could also raise/notify
+        print(f"[insert_data] Skipping invalid CSV row: {row}")
+        return None
+
+    if not user_id:
+        user_id = str(uuid.uuid4())
+
+    # ensure age is an integer
+    try:
+        age_val = int(float(age))
+    except Exception:
+        # fallback: skip or set default age
+        print(f"[insert_data] invalid age '{age}' for {email}, skipping.")
+        return None
+
+    return user_id, name, email, age_val
+
 def insert_data(connection, csv_path):
     """
     Insert data from csv_path into user_data table.
@@ -105,28 +134,10 @@ def insert_data(connection, csv_path):
         reader = csv.DictReader(f)
         rows_inserted = 0
         for row in reader:
-            # normalize keys (handle CSV that might have headers in various case)
-            # Expected headers: user_id (optional), name, email, age
-            user_id = row.get('user_id') or row.get('id') or None
-            name = row.get('name') or row.get('Name') or None
-            email = row.get('email') or row.get('Email') or None
-            age = row.get('age') or row.get('Age') or None
-
-            if not (name and email and age):
-                # skip invalid row, but you could also raise/notify
-                print(f"[insert_data] Skipping invalid CSV row: {row}")
-                continue
-
-            if not user_id:
-                user_id = str(uuid.uuid4())
-
-            # ensure age is an integer
-            try:
-                age_val = int(float(age))
-            except Exception:
-                # fallback: skip or set default age
-                print(f"[insert_data] invalid age '{age}' for {email}, skipping.")
+            record = _normalize_row(row)
+            if record is None:
                 continue
+            user_id, name, email, age_val = record
 
             # Option 1: Use INSERT ... ON DUPLICATE KEY UPDATE if you have a unique key on email.
             # We didn't declare email UNIQUE, so we first check existence by email.
@@ -152,6 +163,112 @@ def insert_data(connection, csv_path):
     cursor.close()
     print(f"Inserted {rows_inserted} new rows from {csv_path}")
 
+# ------------------ Bulk loading ------------------
+
+def read_csv_in_chunks(csv_path, chunk_size=5000):
+    """
+    Generator that streams csv_path as lists of up to chunk_size
+    normalized (user_id, name, email, age) tuples.
+    """
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        chunk = []
+        for row in csv.DictReader(f):
+            record = _normalize_row(row)
+            if record is None:
+                continue
+            chunk.append(record)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+def _existing_emails(cursor, emails):
+    """Return the subset of emails already in user_data (one query, uses idx_email)."""
+    if not emails:
+        return set()
+    placeholders = ", ".join(["%s"] * len(emails))
+    cursor.execute(
+        f"SELECT email FROM user_data WHERE email IN ({placeholders});",
+        tuple(emails)
+    )
+    return {row[0] for row in cursor.fetchall()}
+
+def _load_chunk_local_infile(cursor, chunk):
+    """Send a chunk with LOAD DATA LOCAL INFILE through a temporary CSV file."""
+    with tempfile.NamedTemporaryFile(
+        "w", suffix=".csv", newline='', encoding='utf-8', delete=False
+    ) as tmp:
+        csv.writer(tmp, lineterminator="\n").writerows(chunk)
+    try:
+        cursor.execute(
+            "LOAD DATA LOCAL INFILE %s IGNORE INTO TABLE user_data "
+            "CHARACTER SET utf8mb4 "
+            "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+            "LINES TERMINATED BY '\\n' (user_id, name, email, age);",
+            (tmp.name,)
+        )
+        return cursor.rowcount
+    finally:
+        os.remove(tmp.name)
+
+def bulk_insert_data(connection, csv_path, chunk_size=5000, local_infile=False):
+    """
+    Bulk-load csv_path into user_data with one round-trip per chunk
+    instead of two per row, committing after every chunk.
+    - Duplicate emails are dropped in memory (a set of emails seen so far)
+      and against the table with a single IN (...) lookup per chunk.
+    - Chunks are sent with executemany, which mysql.connector rewrites into
+      one multi-row INSERT IGNORE ... VALUES statement.
+    - With local_infile=True (the connection must allow it), chunks are sent
+      with LOAD DATA LOCAL INFILE instead, falling back to executemany if the
+      server refuses.
+    Returns the number of inserted rows and prints the rows/sec achieved.
+    """
+    cursor = connection.cursor()
+    seen_emails = set()
+    rows_inserted = 0
+    started = time.perf_counter()
+
+    for chunk in read_csv_in_chunks(csv_path, chunk_size):
+        fresh = []
+        for record in chunk:
+            email = record[2]
+            if email not in seen_emails:
+                seen_emails.add(email)
+                fresh.append(record)
+        existing = _existing_emails(cursor, [record[2] for record in fresh])
+        fresh = [record for record in fresh if record[2] not in existing]
+        if not fresh:
+            continue
+
+        try:
+            if local_infile:
+                try:
+                    rows_inserted += _load_chunk_local_infile(cursor, fresh)
+                    connection.commit()
+                    continue
+                except mysql.connector.Error as err:
+                    print(f"[bulk_insert_data] LOAD DATA refused, using INSERT: {err}")
+                    local_infile = False
+            cursor.executemany(
+                "INSERT IGNORE INTO user_data (user_id, name, email, age) "
+                "VALUES (%s, %s, %s, %s);",
+                fresh
+            )
+            rows_inserted += cursor.rowcount
+            connection.commit()
+        except mysql.connector.Error as err:
+            connection.rollback()
+            print(f"[bulk_insert_data] Chunk insert error: {err}")
+
+    cursor.close()
+    elapsed = time.perf_counter() - started
+    rate = rows_inserted / elapsed if elapsed > 0 else 0.0
+    print(f"Inserted {rows_inserted} new rows from {csv_path} "
+          f"in {elapsed:.2f}s ({rate:.0f} rows/sec)")
+    return rows_inserted
+
 # ------------------ Generators for streaming rows ------------------
 
 def stream_user_data_one_by_one(connection):
@@ -175,19 +292,35 @@ def stream_user_data_one_by_one(connection):
     finally:
         cursor.close()
 
-def stream_user_data_in_batches(connection, batch_size=1000):
+def stream_user_data_in_batches(connection, batch_size=1000, lower=None, upper=None,
+                                columnar=False):
     """
     Generator that yields lists of rows (batches), each batch up to batch_size.
     Good for processing large tables in chunks.
+    lower (inclusive) and upper (exclusive) restrict the scan to a user_id
+    range, in primary key order, so several scanners can split the table.
+    With columnar=True, each batch is a columnar.ColumnarBatch instead of a
+    list of tuples (far less memory, vectorized age filters/aggregates).
     """
+    sql = "SELECT user_id, name, email, age FROM user_data"
+    conditions, params = [], []
+    if lower is not None:
+        conditions.append("user_id >= %s")
+        params.append(lower)
+    if upper is not None:
+        conditions.append("user_id < %s")
+        params.append(upper)
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions) + " ORDER BY user_id"
+
     cursor = connection.cursor(buffered=False)
     try:
-        cursor.execute("SELECT user_id, name, email, age FROM user_data;")
+        cursor.execute(sql + ";", tuple(params))
         while True:
             batch = cursor.fetchmany(batch_size)
             if not batch:
                 break
-            yield batch
+            yield ColumnarBatch.from_rows(batch) if columnar else batch
     finally:
         cursor.close()
 
@@ -207,7 +340,6 @@ if __name__ == "__main__":
     create_table(conn)
 
     # If you have user_data.csv in current dir, insert it:
-    import os
     csv_file = "user_data.csv"
     if os.path.exists(csv_file):
         insert_data(conn, csv_file)